@@ -0,0 +1,57 @@
+"""
+Per-request AWS client setup cost: boto3.client() per call (old call sites)
+vs. the shared registry in flaskv2.utils.aws (new call sites).
+
+No network access is needed; dummy credentials are used if none are set.
+
+    python benchmarks/bench_aws_clients.py [iterations]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "AKIABENCHMARK")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("ENVNUM", "1")  # flaskv2.config reads it at import time
+
+import boto3  # noqa: E402
+
+from flaskv2.utils.aws import clear_clients, get_client  # noqa: E402
+
+SERVICES = ("s3", "ec2", "ssm")
+REGION = "us-east-1"
+
+
+def _per_call_ms(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for svc in SERVICES:
+            fn(svc)
+    return (time.perf_counter() - start) * 1000 / (iterations * len(SERVICES))
+
+
+def main(iterations: int = 50) -> None:
+    # Before: every request builds a fresh client (and a fresh connection pool)
+    before = _per_call_ms(lambda svc: boto3.client(svc, region_name=REGION), iterations)
+
+    # After: first call per (service, region) builds, every later call is a dict lookup
+    clear_clients()
+    t0 = time.perf_counter()
+    for svc in SERVICES:
+        get_client(svc, REGION)
+    first_ms = (time.perf_counter() - t0) * 1000 / len(SERVICES)
+    after = _per_call_ms(lambda svc: get_client(svc, REGION), iterations)
+
+    print(f"iterations x services     : {iterations} x {len(SERVICES)} ({', '.join(SERVICES)})")
+    print(f"boto3.client() per request: {before:10.3f} ms/client")
+    print(f"registry, first build     : {first_ms:10.3f} ms/client (once per process)")
+    print(f"registry, per request     : {after:10.4f} ms/client")
+    print(f"speedup per request       : {before / after:10.0f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -8,6 +8,7 @@ from flask_login import current_user
 from flaskv2.config import BaseConfig
 from flaskv2.logging_setup import setup_logging
 from flaskv2.extensions import init_extensions
+from flaskv2.utils.aws import init_aws
 from flaskv2.utils.helpers import get_app_data, get_streams_for_app, _get_envnum
 from flaskv2.utils.page_dict import side_nav_items
 
@@ -52,6 +53,7 @@ def create_app(config_class=BaseConfig):
     os.makedirs(app.config["CACHE_DIR"], exist_ok=True)
 
     init_extensions(app)
+    init_aws(app)
 
     # ---- Warmup at boot ----
     with app.app_context():
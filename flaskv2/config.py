@@ -20,6 +20,8 @@ class BaseConfig:
     SQLALCHEMY_DATABASE_URI         = os.getenv("SQLALCHEMY_DATABASE_URI")
     SQLALCHEMY_TRACK_MODIFICATIONS  = env_bool("SQLALCHEMY_TRACK_MODIFICATIONS", False)
     PERMANENT_SESSION_LIFETIME      = timedelta(hours=3)
+    USER_CACHE_TTL                  = env_int("USER_CACHE_TTL", 60)       # cached login identity (see models.UserCache); 0 = query every request
+    USER_CACHE_MAX                  = env_int("USER_CACHE_MAX", 1024)
 
     # --- Mail ---
     MAIL_SERVER             = os.getenv("MAIL_SERVER")
@@ -62,6 +64,56 @@ class BaseConfig:
     LARS_STREAMS_TTL    = int(os.getenv("LARS_STREAMS_TTL", 30 * 60))
     LARS_BUILDS_TTL     = int(os.getenv("LARS_BUILDS_TTL", 15 * 60))
     LARS_APPS           = [a.strip() for a in os.getenv("LARS_APPS", "MIG,HCM,IEFin,Landmark").split(",") if a.strip()]
+    LARS_CHECKSUM_SUFFIX = os.getenv("LARS_CHECKSUM_SUFFIX", "")   # e.g. ".sha256" if LARS publishes sidecars; direct inject verifies it
+
+    # ---- AWS clients (shared per service/region, see utils/aws.py) ----
+    AWS_MAX_POOL_CONNECTIONS = env_int("AWS_MAX_POOL_CONNECTIONS", 0)   # 0 -> WEB_THREADS x S3_MAX_CONCURRENCY
+    AWS_CONNECT_TIMEOUT      = env_int("AWS_CONNECT_TIMEOUT", 5)
+    AWS_READ_TIMEOUT         = env_int("AWS_READ_TIMEOUT", 30)
+    AWS_RETRY_MODE           = os.getenv("AWS_RETRY_MODE", "standard")  # legacy | standard | adaptive
+    AWS_MAX_ATTEMPTS         = env_int("AWS_MAX_ATTEMPTS", 5)
+    # Throttling governor: "service.Operation=rate:burst" or "service=rate:burst", comma-separated
+    AWS_RATE_LIMITS          = os.getenv("AWS_RATE_LIMITS", "")
+
+    # ---- EC2 stack inventory (in-memory snapshot, see utils/inventory.py) ----
+    STACK_INVENTORY_REFRESH_SECONDS = env_int("STACK_INVENTORY_REFRESH_SECONDS", 30)    # state-only poll
+    STACK_TOPOLOGY_REFRESH_SECONDS  = env_int("STACK_TOPOLOGY_REFRESH_SECONDS", 15 * 60)  # full describe_instances
+    STACK_LIVE_REFRESH_SECONDS      = env_int("STACK_LIVE_REFRESH_SECONDS", 5)            # state poll while the live view is open
+    STACK_LIVE_IDLE_SECONDS         = env_int("STACK_LIVE_IDLE_SECONDS", 30)              # back to the slow poll once no page has asked
+    STACK_CHANGES_WAIT_SECONDS      = env_int("STACK_CHANGES_WAIT_SECONDS", 3)            # long-poll hold per changes request
+    LONG_POLL_MAX_WAITERS           = env_int("LONG_POLL_MAX_WAITERS", 2)                 # request threads allowed to block in long-polls (of WEB_THREADS)
+    STACK_POWER_BATCH               = env_int("STACK_POWER_BATCH", 100)                   # instance ids per start/stop_instances call
+    STORAGE_CACHE_TTL               = env_int("STORAGE_CACHE_TTL", 120)                   # per-stack Get-Volume results
+    STORAGE_REPORT_TTL              = env_int("STORAGE_REPORT_TTL", 3600)                 # fleet storage report
+    STORAGE_REPORT_TIMEOUT          = env_int("STORAGE_REPORT_TIMEOUT", 120)              # per-report SSM deadline
+    AWS_STACK_REGIONS   = [r.strip() for r in os.getenv("AWS_STACK_REGIONS", "us-east-1").split(",") if r.strip()]
+
+    # ---- SSM command tracker ----
+    SSM_POLL_MIN_SECONDS            = env_int("SSM_POLL_MIN_SECONDS", 1)                  # first poll / after a change
+    SSM_POLL_MAX_SECONDS            = env_int("SSM_POLL_MAX_SECONDS", 15)                 # backoff ceiling while unchanged
+    SSM_TRACK_IDLE_SECONDS          = env_int("SSM_TRACK_IDLE_SECONDS", 600)              # stop polling unwatched commands
+    SSM_WAIT_SECONDS                = env_int("SSM_WAIT_SECONDS", 3)                      # long-poll hold time (keep short: holds a web thread)
+
+    # ---- Build inject script ----
+    INJECT_PARALLEL                    = env_int("INJECT_PARALLEL", 4)                    # concurrent 'aws s3 cp' on the target (1 = sequential)
+    INJECT_S3_MAX_CONCURRENT_REQUESTS  = env_int("INJECT_S3_MAX_CONCURRENT_REQUESTS", 0) or None   # AWS CLI default (10) when unset
+    INJECT_S3_MULTIPART_CHUNKSIZE      = os.getenv("INJECT_S3_MULTIPART_CHUNKSIZE") or None        # e.g. "64MB"; CLI default 8MB
+    PIPELINE_UPLOAD_WORKERS            = env_int("PIPELINE_UPLOAD_WORKERS", 3)            # concurrent LARS -> S3 uploads per pipeline job
+    PIPELINE_TIMEOUT_SECONDS           = env_int("PIPELINE_TIMEOUT_SECONDS", 30 * 60)     # give up waiting on inject commands
+
+    # ---- Bastion task scheduler list (see utils/task_jobs.py) ----
+    TASK_SCHEDULER_REFRESH_SECONDS  = env_int("TASK_SCHEDULER_REFRESH_SECONDS", 60)       # background re-collect
+    TASK_SCHEDULER_TTL              = env_int("TASK_SCHEDULER_TTL", 5 * 60)               # older than this: collect on read
+    TASK_SCHEDULER_IDLE_SECONDS     = env_int("TASK_SCHEDULER_IDLE_SECONDS", 10 * 60)     # stop refreshing when nobody looks
+    PS_WORKERS                      = env_int("PS_WORKERS", 2)                            # persistent powershell.exe hosts (0 = spawn per call)
+    PS_WORKER_TIMEOUT               = env_int("PS_WORKER_TIMEOUT", 120)                   # seconds per script call
+
+    # ---- S3 builds page ----
+    S3_TREE_PAGE_SIZE   = env_int("S3_TREE_PAGE_SIZE", 200)  # keys+prefixes per /api/s3/tree page (max 1000)
+    S3_USAGE_TTL        = env_int("S3_USAGE_TTL", 5 * 60)    # per-prefix usage report cache
+    S3_PURGE_WORKERS    = env_int("S3_PURGE_WORKERS", 4)     # concurrent delete_objects batches
+    JOB_RETENTION_SECONDS = env_int("JOB_RETENTION_SECONDS", 60 * 60)  # finished background jobs (purge, pipeline) kept for polling
+    JOB_RETENTION_MAX     = env_int("JOB_RETENTION_MAX", 100)        # ...and at most this many of them
 
 # class DevConfig(BaseConfig):
 #     DEBUG = True
@@ -17,6 +17,7 @@ class DropPathFilter(logging.Filter):
     """Drop very noisy request paths from app/audit logs."""
     DROP_PREFIXES = (
         "/check-session",
+        "/heartbeat",
         "/static/"
     )
     def filter(self, record):
@@ -1,21 +1,30 @@
 from collections import defaultdict, Counter
 from datetime import datetime, timezone
 import json
-import boto3
 import time
 from flask import Blueprint, abort, current_app, flash, jsonify, redirect, render_template, request, session, url_for
 from flask_login import current_user, login_required, logout_user
 
+from flaskv2.extensions import cache
 from flaskv2.main.forms import BlankForm
 from flaskv2.models import User
 from flaskv2.utils.contants import (
+    INJECT_MAX_INSTANCES,
     TMP_BUILDS_CLEAR_LIST,
     TMP_BUILDS_FILTER_REGEX,
     TMP_DIR
 )
-from flaskv2.utils.helpers import _get_envnum, _paginate, _sanitize_suffix, build_prefix_index_from_keys, get_app_data, get_builds_for_app_stream, get_object_version_meta, get_running_landmark_targets, get_stacks_summary, get_streams_for_app, list_pssc_tasks, plan_artifacts, s3_build_prefix_index, stream_exists_live, upload_item, upload_plan
+from flaskv2.utils.helpers import _get_envnum, _paginate, _sanitize_suffix, build_prefix_index_from_keys, get_app_data, get_builds_for_app_stream, get_object_version_meta, get_prefix_purge, resolve_stack_instance, s3_object_signatures, stack_power, stack_regions, get_streams_for_app, plan_artifacts, s3_build_prefix_index, s3_list_prefix_level, s3_prefix_usage, start_prefix_purge, stream_exists_live, upload_item, upload_plan
 
-from flaskv2.utils.ssm import send_inject_command, ssm_get_command_status
+from flaskv2.utils.aws import aws_metrics, get_client
+from flaskv2.utils.background import long_poll_slot
+from flaskv2.utils.inventory import stack_inventory
+from flaskv2.utils.pipeline import get_pipeline, start_pipeline
+from flaskv2.utils.stack_model import STACK_STATES
+from flaskv2.utils.storage_report import get_storage_report, get_storage_report_job, start_storage_report
+from flaskv2.utils.ssm import TERMINAL_STATUSES, VOLUMES_PS_SCRIPT, parse_volumes, send_inject_command, ssm_get_command_status, ssm_run_powershell
+from flaskv2.utils.ssm_tracker import command_tracker
+from flaskv2.utils.task_jobs import task_jobs
 
 
 from botocore.exceptions import ClientError, WaiterError
@@ -192,6 +201,24 @@ def check_session():
     return '', 204  # still valid; no noise
 
 
+@main.route("/heartbeat")
+def heartbeat():
+    """
+    Cheap session poll for every open tab: reads the signed session cookie
+    only (no user load, no DB, no logging). On 401 the page navigates to
+    check_session, which does the logout, audit and flash.
+    """
+    if not session.get("_user_id"):
+        return jsonify({"ok": False, "reason": "unauthenticated"}), 401
+
+    timeout = current_app.permanent_session_lifetime.total_seconds()
+    login_time = session.get("login_time")
+    remaining = timeout - (time.time() - login_time) if login_time else timeout
+    if remaining <= 0:
+        return jsonify({"ok": False, "reason": "expired"}), 401
+    return jsonify({"ok": True, "expires_in": int(remaining)})
+
+
 # @main.post("/lars2aws/upload")
 # @login_required
 # def lars2aws_upload():
@@ -311,15 +338,71 @@ def lars2aws_upload_item():
 
     return jsonify(result), (200 if result.get("ok") else 502)
 
+@main.post("/lars2aws/pipeline")
+@login_required
+def lars2aws_pipeline():
+    """
+    Upload the selected builds and inject them into stacks in one job.
+    Form: the same fields as lars2aws_plan, plus
+      targets  JSON list of {"id", "region"} (running Landmark instances from /api/stacks)
+      preclear "1"/"0" (default on)
+      path     "s3" (default: stage in S3) or "direct" (stacks download from LARS)
+    Responds 202 {ok, job_id}; poll lars2aws_pipeline_status.
+    """
+    apps = current_app.config.get("LARS_APPS", ["MIG", "HCM", "IEFin", "Landmark"])
+    suffix = (request.form.get("migops_lars_suffix") or "").strip()
+    selections = []
+    for app_name in apps:
+        s = (request.form.get(f"summary_{app_name.lower()}_stream") or "").strip()
+        b = (request.form.get(f"summary_{app_name.lower()}_build") or "").strip()
+        if s and b:
+            selections.append({"app": app_name, "stream": s, "build": b})
+
+    try:
+        targets = json.loads(request.form.get("targets") or "[]")
+    except ValueError:
+        targets = None
+    view, _ = stack_inventory.get()
+    known = {(t["id"], t["region"]) for t in view.targets}
+    if (not isinstance(targets, list) or not all(isinstance(t, dict) and (t.get("id"), t.get("region")) in known for t in targets)
+            or len(targets) > INJECT_MAX_INSTANCES):
+        return jsonify({"ok": False, "message": "Targets must be running Landmark stacks (at most %d)." % INJECT_MAX_INSTANCES}), 400
+    targets = [{"id": t["id"], "region": t["region"]} for t in targets]
+
+    try:
+        job_id = start_pipeline(
+            selections=selections,
+            suffix=suffix,
+            targets=targets,
+            preclear=request.form.get("preclear", "1") != "0",
+            path=request.form.get("path") or "s3",
+            actor=current_user.username,
+        )
+    except ValueError as e:
+        return jsonify({"ok": False, "message": str(e)}), 400
+
+    audit("lars2aws.pipeline", outcome="started", job_id=job_id, path=request.form.get("path") or "s3", targets=[t["id"] for t in targets],
+          selected=_selected_from_form(request.form))
+    return jsonify({"ok": True, "job_id": job_id}), 202
+
+@main.get("/lars2aws/pipeline/<job_id>")
+@login_required
+def lars2aws_pipeline_status(job_id: str):
+    job = get_pipeline(job_id)
+    if not job:
+        return jsonify({"ok": False, "error": "unknown job"}), 404
+    return jsonify({"ok": True, **job})
+
 
 @main.route("/aws/instances")
 @login_required
 def instances():
-    stacks = get_stacks_summary(region="us-east-1")
+    view, age = stack_inventory.get()
+    stacks = view.summary
 
     total_stacks = len(stacks)
-    state_counts = Counter(s["state"] for s in stacks)
-    states = ["Running", "Off", "Opening", "Closing", "Degraded", "Unknown"]
+    state_counts = view.state_counts
+    states = STACK_STATES
 
     return render_template(
         "aws/instances.html",
@@ -327,94 +410,183 @@ def instances():
         states=states,
         total_stacks=total_stacks,
         state_counts=state_counts,
+        snapshot_age=int(age),
+        snapshot_version=stack_inventory.version,
+        region_timings=stack_inventory.timings(),
     )
 
+@main.get("/aws/instances/changes")
+@login_required
+def instances_changes():
+    """
+    Bounded long-poll for per-stack state diffs from the shared inventory poller.
+    ?since=<version>. Holds at most STACK_CHANGES_WAIT_SECONDS, and not at all
+    when LONG_POLL_MAX_WAITERS requests are already waiting, so a worker
+    thread is never pinned for long. Responses:
+      {"version", "changed": [summary rows], "removed": [names], "counts": {...}}
+      {"version", "reset": true, "stacks": [summary rows], "counts": {...}}   (since unknown or too old)
+    """
+    since = request.args.get("since", type=int)
+    if since is None:
+        since = -1
+    stack_inventory.get()   # make sure the poller is running
+    stack_inventory.watch()
+    wait = float(current_app.config.get("STACK_CHANGES_WAIT_SECONDS", 3))
+
+    with long_poll_slot() as may_wait:
+        version, diffs = stack_inventory.changes_since(since, timeout=wait if may_wait else 0)
+    view, _ = stack_inventory.get()
+    if diffs is None or since < 0:
+        return jsonify({"version": version, "reset": True, "stacks": view.summary, "counts": view.state_counts})
+    changed = {row["name"]: row for d in diffs for row in d["changed"]}
+    removed = sorted({n for d in diffs for n in d["removed"]} - set(changed))
+    return jsonify({"version": version, "changed": list(changed.values()), "removed": removed, "counts": view.state_counts})
+
+@main.post("/aws/stacks/power")
+@login_required
+def stacks_power():
+    """
+    Admin: start/stop whole stacks.
+    Body JSON: {"action": "start"|"stop", "stacks": ["migops1001", ...], "honor_alwayson": true}
+    """
+    if not current_user.is_admin:
+        audit("access_denied", outcome="denied", reason="not_admin")
+        abort(403)
+
+    data = request.get_json(silent=True) or {}
+    action = data.get("action")
+    names  = data.get("stacks") or []
+    honor  = bool(data.get("honor_alwayson", True))
+    if action not in ("start", "stop") or not isinstance(names, list) or not names \
+            or not all(isinstance(n, str) for n in names):
+        return jsonify({"ok": False, "error": "invalid payload"}), 400
+
+    view, _ = stack_inventory.get()
+    unknown = [n for n in names if n not in view.stacks]
+    if unknown:
+        return jsonify({"ok": False, "error": "unknown stacks", "stacks": unknown}), 404
+
+    start = time.perf_counter()
+    result = stack_power(action, [view.stacks[n] for n in names], honor_alwayson=honor)
+    stack_inventory.apply_states(result["states"])
+
+    audit(
+        "stack_power",
+        outcome="error" if result["errors"] else "ok",
+        power_action=action,
+        stacks=sorted(result["instances"]),
+        instance_count=sum(len(v) for v in result["instances"].values()),
+        skipped=result["skipped"],
+        errors=result["errors"],
+        duration_ms=round((time.perf_counter() - start) * 1000, 2),
+    )
+    return jsonify({"ok": not result["errors"], **result}), (502 if result["errors"] and not result["states"] else 200)
+
+def _db_volumes_key(stack_name: str) -> str:
+    return f"db_volumes:v1:{stack_name}"
+
 @main.route("/aws/stack/<stack_name>/storage-db-live")
 @login_required
 def stack_storage_db_live(stack_name: str):
-    region = "us-east-1"
-    ec2 = boto3.client("ec2", region_name=region)
-    ssm = boto3.client("ssm", region_name=region)
-
-    # 1) Find the DB instance id for this stack
-    db_instance_id = None
-    paginator = ec2.get_paginator("describe_instances")
-    for page in paginator.paginate(
-        Filters=[{"Name": "tag:aws:cloudformation:stack-name", "Values": [stack_name]}]
-    ):
-        for res in page.get("Reservations", []):
-            for inst in res.get("Instances", []):
-                tags = {t["Key"]: t["Value"] for t in inst.get("Tags", [])}
-                if tags.get("aws:cloudformation:logical-id") == "INFORBCDB01Instance":
-                    db_instance_id = inst["InstanceId"]
+    """
+    Start a Get-Volume check on the stack's DB host and return immediately.
+      200 {"ok", "volumes", "cached": true, "age"}   recent result from cache
+      202 {"ok", "command_id", "db_instance_id"}     poll stack_storage_db_status
+    """
+    cached = cache.get(_db_volumes_key(stack_name))
+    if cached and request.args.get("refresh") != "1":
+        return jsonify({"ok": True, "stack": stack_name, **cached, "cached": True,
+                        "age": int(time.time() - cached["checked_at"])})
 
+    # Find the DB instance id for this stack (stack index; EC2 only on a miss)
+    db_instance_id, region = resolve_stack_instance(stack_name, "INFORBCDB01Instance")
     if not db_instance_id:
-        return jsonify({"stack": stack_name, "error": "DB instance not found"}), 404
-
-    # 2) Send SSM command to run PowerShell on Windows (Get-Volume -> JSON)
-    #    Output: DriveLetter, FileSystemLabel, Size, SizeRemaining
-    ps_script = r"""
-$vols = Get-Volume | Where-Object { $_.DriveLetter -ne $null }
-$vols | Select-Object DriveLetter, FileSystemLabel,
-    @{n='Size';e={[int64]$_.Size}},
-    @{n='SizeRemaining';e={[int64]$_.SizeRemaining}} | ConvertTo-Json -Depth 3
-""".strip()
+        return jsonify({"ok": False, "stack": stack_name, "error": "DB instance not found"}), 404
 
     try:
-        send_resp = ssm.send_command(
-            InstanceIds=[db_instance_id],
-            DocumentName="AWS-RunPowerShellScript",
-            Parameters={"commands": [ps_script]},
-            CloudWatchOutputConfig={"CloudWatchOutputEnabled": False},
-            TimeoutSeconds=60,
+        command_id = ssm_run_powershell(
+            instance_ids=[db_instance_id],
+            commands=[VOLUMES_PS_SCRIPT],
+            region=region,
+            comment=f"Storage check {stack_name}",
         )
-        command_id = send_resp["Command"]["CommandId"]
     except ClientError as e:
-        return jsonify({"stack": stack_name, "error": f"SSM send failed: {e.response['Error'].get('Message', 'Unknown')}"}), 500
-
-    # 3) Poll for command result (simple loop; ~10s max)
-    status = "InProgress"
-    output = None
-    for _ in range(20):
-        time.sleep(0.5)
-        inv = ssm.get_command_invocation(CommandId=command_id, InstanceId=db_instance_id)
-        status = inv.get("Status")
-        if status in ("Success", "Cancelled", "Failed", "TimedOut"):
-            output = inv.get("StandardOutputContent") or ""
-            error_out = inv.get("StandardErrorContent") or ""
-            break
+        return jsonify({"ok": False, "stack": stack_name, "error": f"SSM send failed: {e.response['Error'].get('Message', 'Unknown')}"}), 502
+
+    current_app.app_log.info("storage_check_sent", extra={"stack": stack_name, "command_id": command_id})
+    return jsonify({"ok": True, "stack": stack_name, "command_id": command_id, "db_instance_id": db_instance_id}), 202
+
+@main.route("/aws/stack/<stack_name>/storage-db-live/<command_id>")
+@login_required
+def stack_storage_db_status(stack_name: str, command_id: str):
+    """Poll a storage check; on success the parsed volumes are cached for STORAGE_CACHE_TTL."""
+    db_instance_id, region = resolve_stack_instance(stack_name, "INFORBCDB01Instance")
+    if not db_instance_id:
+        return jsonify({"ok": False, "stack": stack_name, "error": "DB instance not found"}), 404
+
+    try:
+        stat = ssm_get_command_status(command_id=command_id, instance_id=db_instance_id, region=region)
+    except ClientError as e:
+        return jsonify({"ok": False, "stack": stack_name, "error": e.response["Error"].get("Message", "SSM status failed")}), 502
 
+    status = stat["status"]
+    if status not in TERMINAL_STATUSES:
+        return jsonify({"ok": True, "stack": stack_name, "status": status, "done": False})
     if status != "Success":
-        return jsonify({"stack": stack_name, "status": status, "error": (error_out or "Command did not succeed")}), 500
+        return jsonify({"ok": False, "stack": stack_name, "status": status, "done": True,
+                        "error": stat["stderr"] or "Command did not succeed"}), 500
 
-    # 4) Parse JSON -> compute used/free in GiB
-    import json, math
     try:
-        data = json.loads(output)
-        # PowerShell returns either an object or an array
-        volumes = data if isinstance(data, list) else [data]
-        result = []
-        for v in volumes:
-            size_b = int(v.get("Size") or 0)
-            free_b = int(v.get("SizeRemaining") or 0)
-            used_b = max(size_b - free_b, 0)
-            gib = 1024 ** 3
-            result.append({
-                "drive": str(v.get("DriveLetter") or "").upper(),
-                "label": v.get("FileSystemLabel") or "",
-                "size_gib": round(size_b / gib, 2),
-                "used_gib": round(used_b / gib, 2),
-                "free_gib": round(free_b / gib, 2),
-            })
+        volumes = parse_volumes(stat["stdout"])
     except Exception as e:
-        return jsonify({"stack": stack_name, "error": f"Parse failed: {e}", "raw": output}), 500
+        return jsonify({"ok": False, "stack": stack_name, "done": True, "error": f"Parse failed: {e}", "raw": stat["stdout"]}), 500
 
-    return jsonify({
-        "stack": stack_name,
+    result = {
         "db_instance_id": db_instance_id,
-        "volumes": result,
-        "note": "Live values from Get-Volume via SSM. Used=Size-SizeRemaining."
-    }), 200
+        "volumes": volumes,
+        "note": "Live values from Get-Volume via SSM. Used=Size-SizeRemaining.",
+        "checked_at": time.time(),
+    }
+    cache.set(_db_volumes_key(stack_name), result, timeout=int(current_app.config.get("STORAGE_CACHE_TTL", 120)))
+    return jsonify({"ok": True, "stack": stack_name, "status": status, "done": True, **result})
+
+@main.route("/aws/storage-report")
+@login_required
+def storage_report():
+    report = get_storage_report()
+    return render_template(
+        "aws/storage_report.html",
+        report=report,
+        report_age=int(time.time() - report["generated_at"]) if report else None,
+        job=get_storage_report_job(),
+    )
+
+@main.post("/api/storage-report")
+@login_required
+def api_storage_report_run():
+    """
+    Admin: start a fleet-wide Get-Volume report (one SSM command per 50 DB
+    hosts per region). While one is running, this joins it instead.
+    """
+    if not current_user.is_admin:
+        audit("access_denied", outcome="denied", reason="not_admin")
+        abort(403)
+
+    view, _ = stack_inventory.get()
+    job = start_storage_report(list(view.stacks.values()), actor=current_user.username)
+    audit("storage_report", outcome="started", stacks=job["stacks"])
+    return jsonify({"ok": True, "job": job}), 202
+
+@main.get("/api/storage-report")
+@login_required
+def api_storage_report():
+    report = get_storage_report()
+    return jsonify({
+        "ok": True,
+        "job": get_storage_report_job(),
+        "report": report,
+        "age": int(time.time() - report["generated_at"]) if report else None,
+    })
 
 
 # @main.route("/aws/instances")
@@ -426,8 +598,17 @@ $vols | Select-Object DriveLetter, FileSystemLabel,
 @login_required
 def task_scheduler_list():
     current_app.app_log.info("view_task_scheduler_jobs")
-    jobs = list_pssc_tasks()
-    return render_template("bastion/task_scheduler_jobs.html", jobs=jobs)
+    jobs, age = task_jobs.get()
+    return render_template("bastion/task_scheduler_jobs.html", jobs=jobs, age=int(age))
+
+
+@main.route("/bastion/task-scheduler-jobs/refresh", methods=["POST"])
+@login_required
+def task_scheduler_refresh():
+    """Re-collect the task list now (joins a collection already in flight)."""
+    task_jobs.refresh()
+    audit("task_scheduler_refresh", outcome="success")
+    return redirect(url_for("main.task_scheduler_list"))
 
 # ----------
 
@@ -435,14 +616,95 @@ def task_scheduler_list():
 @login_required
 def s3_builds():
     current_app.app_log.info("view_s3_builds")
+    # Folders are loaded level-by-level from /api/s3/tree, so the first render
+    # does not depend on how many keys live under LARS/.
+    return render_template("aws/s3_builds.html")
+
+@main.get("/api/s3/tree")
+@login_required
+def api_s3_tree():
+    """
+    One prefix level of the LARS/ tree (folders + files), paginated.
+    Query: ?prefix=MT/&token=<continuation token>
+    """
+    rel_prefix = request.args.get("prefix") or ""
+    token      = (request.args.get("token") or "").strip() or None
+
+    try:
+        level = s3_list_prefix_level(
+            bucket="migops",
+            root="LARS/",
+            rel_prefix=rel_prefix,
+            continuation_token=token,
+        )
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    except ClientError as e:
+        current_app.logger.exception("s3_tree_list_failed")
+        return jsonify({"ok": False, "error": e.response["Error"].get("Message", "S3 list failed")}), 502
+
+    current_app.app_log.info(
+        "s3_tree_level",
+        extra={"prefix": level["prefix"], "files": level["file_count"], "folders": level["folder_count"]},
+    )
+    return jsonify({"ok": True, **level})
+
+@main.get("/api/s3/prefix-usage")
+@login_required
+def api_s3_prefix_usage():
+    """Admin: per-folder object count, bytes and newest LastModified under LARS/."""
+    if not current_user.is_admin:
+        audit("access_denied", outcome="denied", reason="not_admin")
+        abort(403)
 
+    force = request.args.get("refresh") == "1"
+    start = time.perf_counter()
     try:
-        prefix_map = s3_build_prefix_index(bucket="migops", root="LARS/")
+        usage = s3_prefix_usage(bucket="migops", root="LARS/", force_refresh=force)
     except ClientError as e:
-        abort(500)
+        current_app.logger.exception("s3_prefix_usage_failed")
+        return jsonify({"ok": False, "error": e.response["Error"].get("Message", "S3 list failed")}), 502
+
+    current_app.app_log.info(
+        "s3_prefix_usage",
+        extra={"prefixes": len(usage), "duration_ms": round((time.perf_counter() - start) * 1000, 2)},
+    )
+    return jsonify({"ok": True, "prefixes": usage})
+
+@main.post("/api/s3/purge")
+@login_required
+def api_s3_purge():
+    """
+    Admin: delete whole LARS/<prefix>/ folders.
+    Body JSON: {"prefixes": ["OLD_SUFFIX/", ...]}
+    """
+    if not current_user.is_admin:
+        audit("access_denied", outcome="denied", reason="not_admin")
+        abort(403)
+
+    data = request.get_json(silent=True) or {}
+    prefixes = data.get("prefixes") or []
+    if not isinstance(prefixes, list) or not prefixes or not all(isinstance(p, str) for p in prefixes):
+        return jsonify({"ok": False, "error": "invalid payload"}), 400
 
+    try:
+        job_id = start_prefix_purge(bucket="migops", root="LARS/", prefixes=prefixes, actor=current_user.username)
+    except ValueError as e:
+        audit("s3_prefix_purge", outcome="denied", prefixes=prefixes, reason=str(e))
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    audit("s3_prefix_purge", outcome="started", job_id=job_id, prefixes=prefixes)
+    return jsonify({"ok": True, "job_id": job_id}), 202
 
-    return render_template("aws/s3_builds.html", prefix_map=prefix_map)
+@main.get("/api/s3/purge/<job_id>")
+@login_required
+def api_s3_purge_status(job_id: str):
+    if not current_user.is_admin:
+        abort(403)
+    job = get_prefix_purge(job_id)
+    if not job:
+        return jsonify({"ok": False, "error": "unknown job"}), 404
+    return jsonify({"ok": True, **job})
 
 @main.route("/api/s3/object_meta")
 @login_required
@@ -458,14 +720,27 @@ def s3_object_meta():
 @login_required
 def api_stacks():
     state = (request.args.get("state") or "").lower()
+    view, age = stack_inventory.get()
     # Strict: a stack is "running" only if all 4 required roles are running,
     # and we return just the Landmark app instance (INFORBCLM01LInstance).
     if state == "running":
-        data = get_running_landmark_targets(region="us-east-1")
-        return jsonify(data)
-    # Optional fallback: full summary (if you ever need it)
-    data = get_stacks_summary(region="us-east-1")
-    return jsonify(data)
+        data = view.targets
+    else:
+        # Optional fallback: full summary (if you ever need it)
+        data = view.summary
+    resp = jsonify(data)
+    resp.headers["X-Snapshot-Age"] = str(int(age))   # seconds since the inventory was collected
+    return resp
+
+
+@main.get("/api/aws/metrics")
+@login_required
+def api_aws_metrics():
+    """Throttling governor metrics per AWS API, for sizing polling intervals."""
+    if not current_user.is_admin:
+        audit("access_denied", outcome="denied", reason="not_admin")
+        abort(403)
+    return jsonify({"ok": True, "apis": aws_metrics()})
 
 
 #### INJECT ROUTES
@@ -476,51 +751,119 @@ def api_inject():
     """
     Body JSON:
       {
-        "instance_id": "i-...",
+        "instance_ids": ["i-...", ...],  // or "instance_id": "i-..."; up to 50, all in `region`
+        "region": "us-east-1",
         "key_prefix": "MT/AUG/",  // "" for root (LARS/)
-        "files": ["Install-LMMIG.jar", "LANDMARK.jar"]
+        "files": ["Install-LMMIG.jar", "LANDMARK.jar"],
+        "sync": false             // true => skip files already on the target with the same size/ETag
       }
+    All instances share one SendCommand, followed by the shared command tracker
+    (api_inject_wait / api_inject_invocations).
     """
     data = request.get_json(silent=True) or {}
-    instance_id = (data.get("instance_id") or "").strip()
+    instance_ids = data.get("instance_ids") or ([data["instance_id"]] if data.get("instance_id") else [])
     key_prefix  = data.get("key_prefix") or ""
     files       = data.get("files") or []
     preclear    = bool(data.get("preclear", True))
+    sync        = bool(data.get("sync", False))
+    region      = data.get("region") or stack_regions()[0]
 
-    if not instance_id or not isinstance(files, list) or not all(isinstance(x, str) for x in files):
+    if (not isinstance(instance_ids, list) or not instance_ids or not all(isinstance(x, str) and x.strip() for x in instance_ids)
+            or not isinstance(files, list) or not all(isinstance(x, str) for x in files)):
         return jsonify({"ok": False, "error": "invalid payload"}), 400
+    instance_ids = list(dict.fromkeys(x.strip() for x in instance_ids))
+    if len(instance_ids) > INJECT_MAX_INSTANCES:
+        return jsonify({"ok": False, "error": f"at most {INJECT_MAX_INSTANCES} instances per inject"}), 400
+    if region not in stack_regions():
+        return jsonify({"ok": False, "error": "unknown region"}), 400
 
-    audit("builds_inject", instance_id=instance_id, files=files) # Replace instance_id to stack name (migops###)
+    audit("builds_inject", instance_ids=instance_ids, files=files, sync=sync) # Replace instance_id to stack name (migops###)
 
     try:
         # If preclear=False, pass empty list; else pass None to use defaults
         preclear_names = [] if not preclear else TMP_BUILDS_CLEAR_LIST
+        sync_signatures = None
+        if sync:
+            sigs = s3_object_signatures("migops", "LARS/", [f"{key_prefix}{f}" for f in files])
+            sync_signatures = {f: sigs[f"{key_prefix}{f}"] for f in files if f"{key_prefix}{f}" in sigs}
 
         cmd_id = send_inject_command(
-            instance_id=instance_id,
+            instance_ids=instance_ids,
             bucket="migops",
             root="LARS/",
             key_prefix=key_prefix,
             files=files,
-            region="us-east-1",
+            region=region,
             dest=TMP_DIR,
             preclear_names=preclear_names,
             filtered_listing=True,
             list_filter_regex=TMP_BUILDS_FILTER_REGEX,
+            parallel=int(current_app.config.get("INJECT_PARALLEL", 1)),
+            s3_max_concurrent_requests=current_app.config.get("INJECT_S3_MAX_CONCURRENT_REQUESTS"),
+            s3_multipart_chunksize=current_app.config.get("INJECT_S3_MULTIPART_CHUNKSIZE"),
+            sync_signatures=sync_signatures,
         )
-        return jsonify({"ok": True, "job_id": cmd_id, "instance_id": instance_id})
+        command_tracker.track(cmd_id, region, instance_ids)
+        return jsonify({"ok": True, "job_id": cmd_id, "instance_id": instance_ids[0], "instance_ids": instance_ids, "region": region})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
+def _inject_snapshot(job_id: str, *, wait_since: int | None = None):
+    """
+    Tracker snapshot for an inject command; (snapshot, None) or (None, error response).
+    A command this process has not seen (e.g. after a restart) is registered from
+    the instance_ids / instance_id query args.
+    """
+    region = request.args.get("region") or stack_regions()[0]
+    if region not in stack_regions():
+        return None, (jsonify({"ok": False, "error": "unknown region"}), 400)
+    if command_tracker.snapshot(job_id) is None:
+        ids = [x.strip() for x in (request.args.get("instance_ids") or request.args.get("instance_id") or "").split(",") if x.strip()]
+        if not ids:
+            return None, (jsonify({"ok": False, "error": "unknown job; pass instance_ids"}), 404)
+        command_tracker.track(job_id, region, ids)
+    if wait_since is None:
+        return command_tracker.snapshot(job_id), None
+    with long_poll_slot() as may_wait:
+        timeout = float(current_app.config.get("SSM_WAIT_SECONDS", 3)) if may_wait else 0
+        return command_tracker.wait(job_id, wait_since, timeout=timeout), None
+
+@main.route("/api/inject/<job_id>/invocations")
+@login_required
+def api_inject_invocations(job_id: str):
+    """
+    Aggregated status of a (multi-instance) inject, served from the shared
+    command tracker. Query: region, instance_ids (comma-separated, only needed
+    if this process is not tracking the command yet).
+    """
+    snap, err = _inject_snapshot(job_id)
+    if err:
+        return err
+    return jsonify({"ok": True, **snap})
+
+@main.route("/api/inject/<job_id>/wait")
+@login_required
+def api_inject_wait(job_id: str):
+    """
+    Long-poll: returns as soon as the command's snapshot version passes `since`
+    (or it is done), else after SSM_WAIT_SECONDS with the unchanged snapshot.
+    When LONG_POLL_MAX_WAITERS requests are already waiting it answers at once;
+    the client pauses before asking again when nothing changed.
+    """
+    snap, err = _inject_snapshot(job_id, wait_since=request.args.get("since", -1, type=int))
+    if err:
+        return err
+    return jsonify({"ok": True, **snap})
+
 @main.route("/api/inject/<job_id>/status")
 @login_required
 def api_inject_status(job_id: str):
+    """Single-instance view of the tracker snapshot (kept for existing callers)."""
     instance_id = (request.args.get("instance_id") or "").strip()
     if not instance_id:
         return jsonify({"ok": False, "error": "missing instance_id"}), 400
-    try:
-        stat = ssm_get_command_status(command_id=job_id, instance_id=instance_id, region="us-east-1")
-        stat["ok"] = True
-        return jsonify(stat)
-    except Exception as e:
-        return jsonify({"ok": False, "error": str(e)}), 500
\ No newline at end of file
+    snap, err = _inject_snapshot(job_id)
+    if err:
+        return err
+    inv = snap["invocations"].get(instance_id) or {"status": "Pending", "status_details": "Pending", "stdout": ""}
+    return jsonify({"ok": True, "stderr": "", "stdout_url": "", "stderr_url": "", **inv})
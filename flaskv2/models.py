@@ -1,4 +1,8 @@
 
+import threading
+import time
+from collections import OrderedDict
+
 from flask_login import UserMixin
 from flaskv2.extensions import db, login_manager
 from flask import current_app
@@ -6,19 +10,11 @@ from itsdangerous import URLSafeTimedSerializer as Serializer
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return user_cache.get(int(user_id))
 
-class User(db.Model, UserMixin):
-    __tablename__ = 'users'
 
-    id              = db.Column(db.Integer, primary_key=True)
-    username        = db.Column(db.String(50), unique=True, nullable=False)
-    email           = db.Column(db.String(100), unique=True, nullable=False)
-    password        = db.Column(db.String(200), nullable=False)
-    created_date    = db.Column(db.DateTime, server_default=db.func.now())
-    is_active       = db.Column(db.Boolean, default=False)
-    last_login      = db.Column(db.DateTime)
-    is_admin        = db.Column(db.Boolean, default=False)
+class UserPermissionsMixin:
+    """Permission checks shared by the ORM User and the cached identity (compare by id, not object)."""
 
     def is_root(self):
         return self.username == 'root'
@@ -27,7 +23,7 @@ class User(db.Model, UserMixin):
 
         # root can delete anyone except self
         if self.is_root():
-            return self != target_user  
+            return self.id != target_user.id
         
         # Admins can delete non-admin, non-root users
         if self.is_admin:
@@ -41,6 +37,84 @@ class User(db.Model, UserMixin):
     def can_revoke_admin(self, target_user):
         return self.is_root() and target_user.is_admin and not target_user.is_root()
 
+
+class CachedUser(UserPermissionsMixin, UserMixin):
+    """
+    Detached, read-only identity for current_user, built from a User row.
+    Holds only what requests read; load the User for anything that writes.
+    """
+    __slots__ = ("id", "username", "email", "is_admin", "is_active")
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.is_admin = bool(user.is_admin)
+        self.is_active = bool(user.is_active)
+
+
+class UserCache:
+    """
+    Bounded in-process cache of CachedUser by id, so load_user (every
+    authenticated request, including the session poll) skips the users query.
+    Entries live USER_CACHE_TTL seconds (0 disables the cache) and the least
+    recently used go first beyond USER_CACHE_MAX. Routes that change a user's
+    admin flag, activation or existence call invalidate() after committing;
+    the TTL bounds staleness for changes made elsewhere (other processes, SQL).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, tuple[float, CachedUser]]" = OrderedDict()
+
+    def get(self, user_id: int):
+        ttl = int(current_app.config.get("USER_CACHE_TTL", 60))
+        now = time.monotonic()
+        if ttl > 0:
+            with self._lock:
+                hit = self._entries.get(user_id)
+                if hit and hit[0] > now:
+                    self._entries.move_to_end(user_id)
+                    return hit[1]
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            self.invalidate(user_id)
+            return None
+        if ttl <= 0:
+            return user
+        identity = CachedUser(user)
+        with self._lock:
+            self._entries[user_id] = (now + ttl, identity)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > int(current_app.config.get("USER_CACHE_MAX", 1024)):
+                self._entries.popitem(last=False)
+        return identity
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class User(db.Model, UserPermissionsMixin, UserMixin):
+    __tablename__ = 'users'
+
+    id              = db.Column(db.Integer, primary_key=True)
+    username        = db.Column(db.String(50), unique=True, nullable=False)
+    email           = db.Column(db.String(100), unique=True, nullable=False)
+    password        = db.Column(db.String(200), nullable=False)
+    created_date    = db.Column(db.DateTime, server_default=db.func.now())
+    is_active       = db.Column(db.Boolean, default=False)
+    last_login      = db.Column(db.DateTime)
+    is_admin        = db.Column(db.Boolean, default=False)
+
     def get_reset_token(self):
         s = Serializer(current_app.config['SECRET_KEY'])
         return s.dumps({'user_id': self.id})
@@ -213,7 +213,7 @@ function DescribeFromCim($t){
 }
 
 $tasks = Get-ScheduledTask -TaskName "$Prefix*" -ErrorAction SilentlyContinue
-if (-not $tasks) { @() | ConvertTo-Json -Depth 4; exit }
+if (-not $tasks) { @() | ConvertTo-Json -Depth 4; return }
 
 
 $codeMap = @{
@@ -0,0 +1,32 @@
+# Long-lived script host for JsonLineWorkerPool (utils/helpers.py).
+# Reads one JSON request per line on stdin:  {"id": 1, "script": "C:\...\fetch_jobs.ps1", "args": {"Prefix": "PSSC-"}}
+# Writes one JSON response per line:         {"id": 1, "ok": true, "output": "<script output>"}
+# Scripts are compiled once and cached, and modules stay imported between requests.
+
+$ErrorActionPreference = 'Stop'
+$ProgressPreference    = 'SilentlyContinue'
+try { Import-Module ScheduledTasks -ErrorAction Stop } catch { }
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+[Console]::InputEncoding  = [System.Text.Encoding]::UTF8
+
+$compiled = @{}
+
+while ($null -ne ($line = [Console]::In.ReadLine())) {
+  if (-not $line.Trim()) { continue }
+  $id = $null
+  try {
+    $req = $line | ConvertFrom-Json
+    $id  = $req.id
+    if (-not $compiled.ContainsKey($req.script)) {
+      $compiled[$req.script] = [scriptblock]::Create((Get-Content -LiteralPath $req.script -Raw))
+    }
+    $params = @{}
+    if ($req.args) { foreach ($p in $req.args.PSObject.Properties) { $params[$p.Name] = $p.Value } }
+    $output = (& $compiled[$req.script] @params | Out-String).Trim()
+    $resp = [pscustomobject]@{ id = $id; ok = $true; output = $output }
+  } catch {
+    $resp = [pscustomobject]@{ id = $id; ok = $false; error = $_.Exception.Message }
+  }
+  [Console]::Out.WriteLine(($resp | ConvertTo-Json -Compress -Depth 3))
+  [Console]::Out.Flush()
+}
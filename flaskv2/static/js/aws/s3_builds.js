@@ -13,9 +13,10 @@ let injectModal;
 
   // ----- Page config handed off by Jinja in s3_builds.html -----
   const S3B = window.S3B || {};
-  const PREFIX_MAP = S3B.PREFIX_MAP || {};
+  const TREE_URL = S3B.TREE_URL || '/api/s3/tree';
   const BUCKET = S3B.BUCKET || 'migops';
   const ROOT   = S3B.ROOT   || 'LARS';
+  const MAX_INJECT_TARGETS = 50;   // server caps one SendCommand at 50 instances
 
   // Cache S3 version metadata by relative key (e.g., "MT/AUG/LANDMARK.jar")
   const META_CACHE = new Map();
@@ -53,6 +54,7 @@ let injectModal;
       const resp = await fetch('/api/stacks?state=running', { credentials: 'same-origin' });
       if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
       const list = await resp.json();
+      injectState.snapshotAge = resp.headers.get('X-Snapshot-Age');
 
       renderStacks(list.map(s => ({
         id: s.id,
@@ -75,7 +77,7 @@ let injectModal;
   function resetInjectModalUI() {
     // steps
     goStep(1);
-    document.getElementById('inj-hint').textContent = 'Pick the Landmark stack that will receive the files.';
+    document.getElementById('inj-hint').textContent = 'Pick the Landmark stack(s) that will receive the files.';
 
     // progress pane
     const prog = document.getElementById('inj-progress');
@@ -93,7 +95,7 @@ let injectModal;
 
     // state
     injectState.selectedFiles.clear();
-    injectState.selectedStack = null;
+    injectState.selectedStacks.clear();
     injectState.preclearEnabled = true;
 
     // step tables
@@ -106,6 +108,7 @@ let injectModal;
 
     const preclearChk = document.getElementById('inj-preclear');
     if (preclearChk) preclearChk.checked = true;
+    document.getElementById('inj-sync').checked = false;
     document.getElementById('preclearAlert').classList.remove('d-none');
   }
 
@@ -122,7 +125,7 @@ let injectModal;
     submitBtn.classList.remove('d-none');
     submitBtn.disabled = true;
     submitBtn.textContent = 'Injecting…';
-    document.getElementById('inj-hint').textContent = 'Running SSM command on the selected stack…';
+    document.getElementById('inj-hint').textContent = 'Running SSM command on the selected stack(s)…';
     // clear log/status
     document.getElementById('inj-log').textContent = '';
     const badge = document.getElementById('inj-status-badge');
@@ -148,18 +151,41 @@ let injectModal;
     if (outText) logEl.textContent = outText;
   }
 
-  // ----- Build DataTable rows from PREFIX_MAP -----
-  function buildRows() {
-    return Object.entries(PREFIX_MAP).map(([prefix, files]) => {
-      const isRoot = (prefix === 'LARS/' || prefix === '' || prefix === '/');
-      return {
-        displayPrefix: isRoot ? 'LARS/' : prefix,
-        category:      isRoot ? 'ROOT'  : prefix.split('/')[0],
-        keyPrefix:     isRoot ? ''      : prefix, // used to build s3://migops/LARS/<keyPrefix>...
-        files,
-        files_count:   files.length
-      };
+  // ----- Folder rows (one per S3 prefix level, loaded on demand) -----
+  function makeRow(keyPrefix) {
+    const isRoot = (keyPrefix === '' || keyPrefix === '/');
+    return {
+      displayPrefix: isRoot ? 'LARS/' : keyPrefix,
+      category:      isRoot ? 'ROOT'  : keyPrefix.split('/')[0],
+      keyPrefix:     isRoot ? ''      : keyPrefix, // used to build s3://migops/LARS/<keyPrefix>...
+      files:         [],
+      files_count:   null,   // null until the level has been fetched
+      loaded:        false,
+      nextToken:     null
+    };
+  }
+
+  // Fetch one page of a prefix level and merge it into the row.
+  // Returns the child folder prefixes found on that page.
+  async function fetchLevelPage(row) {
+    const params = new URLSearchParams({ prefix: row.keyPrefix });
+    if (row.nextToken) params.set('token', row.nextToken);
+
+    const resp = await fetch(`${TREE_URL}?${params}`, { credentials: 'same-origin' });
+    const data = await resp.json();
+    if (!resp.ok || !data.ok) throw new Error(data.error || `HTTP ${resp.status}`);
+
+    (data.files || []).forEach(f => {
+      row.files.push(f.name);
+      const relKey = `${row.keyPrefix}${f.name}`;
+      if (!LASTMOD_CACHE.has(relKey)) {
+        LASTMOD_CACHE.set(relKey, f.last_modified ? fmtLastMod(f.last_modified) : '—');
+      }
     });
+    row.files_count = row.files.length;
+    row.nextToken   = data.next_token || null;
+    row.loaded      = true;
+    return (data.folders || []).map(f => f.prefix);
   }
 
   // ----- Child row renderer (includes Metadata and Copy action) -----
@@ -198,6 +224,7 @@ let injectModal;
             <tbody>${fileRows || `<tr><td colspan="5" class="text-muted">No files</td></tr>`}</tbody>
           </table>
         </div>
+        ${row.nextToken ? `<button type="button" class="btn btn-sm btn-outline-secondary mt-2 btn-load-more">Load more</button>` : ''}
       </div>`;
   }
 
@@ -298,9 +325,10 @@ let injectModal;
     displayPrefix: '',   // "LARS/" or "MT/AUG/"
     keyPrefix: '',       // "" or "MT/AUG/"
     files: [],           // files available under keyPrefix
-    selectedStack: null, // {id, name, region}
+    selectedStacks: new Map(), // id -> {id, name, region}; one SendCommand per region
     selectedFiles: new Set(),
-    preclearEnabled: true
+    preclearEnabled: true,
+    snapshotAge: null    // seconds, from the X-Snapshot-Age header of /api/stacks
   };
 
   function goStep(n) {
@@ -316,13 +344,13 @@ let injectModal;
 
     // step label
     const stepLbl = document.getElementById('inj-step-indicator');
-    if (n === 1) stepLbl.textContent = 'Step 1 of 3 — Select target stack';
+    if (n === 1) stepLbl.textContent = 'Step 1 of 3 — Select target stack(s)';
     if (n === 2) stepLbl.textContent = 'Step 2 of 3 — Select files to inject';
     if (n === 3) stepLbl.textContent = 'Step 3 of 3 — Confirm & inject';
 
     // contextual hint
     const hint = document.getElementById('inj-hint');
-    if (n === 1) hint.textContent = 'Pick the Landmark stack that will receive the files.';
+    if (n === 1) hint.textContent = 'Pick the Landmark stack(s) that will receive the files.';
     if (n === 2) hint.textContent = 'Choose which files to copy into /opt/infor/landmark/tmp.';
     if (n === 3) hint.textContent = 'Review and confirm.';
   }
@@ -331,7 +359,8 @@ let injectModal;
     const tbody = document.querySelector('#stacksTable tbody');
     const rowsHtml = list.map(s => `
       <tr>
-        <td><input type="radio" name="stackPick" value="${s.id}" aria-label="Select ${s.name}"></td>
+        <td><input type="checkbox" class="stackPick" value="${s.id}" aria-label="Select ${s.name}"
+                   ${injectState.selectedStacks.has(s.id) ? 'checked' : ''}></td>
         <td>${s.name}</td>
         <td><code>${s.id}</code></td>
         <td>${s.region || ''}</td>
@@ -351,7 +380,9 @@ let injectModal;
       tr.classList.toggle('d-none', !keep);
       if (keep) shown++;
     });
-    document.getElementById('stacksSummary').textContent = `${shown} stacks`;
+    const age = injectState.snapshotAge;
+    document.getElementById('stacksSummary').textContent =
+      `${shown} stacks` + (age != null ? ` · states as of ${age}s ago` : '');
   }
 
   function renderFiles() {
@@ -389,7 +420,10 @@ let injectModal;
   }
 
   function renderSummary() {
-    document.getElementById('sum-stack').textContent  = `${injectState.selectedStack?.name || '—'} (${injectState.selectedStack?.id || ''})`;
+    const picked = [...injectState.selectedStacks.values()];
+    document.getElementById('sum-stack').textContent  = picked.length === 1
+      ? `${picked[0].name} (${picked[0].id})`
+      : `${picked.length} stacks: ${picked.map(s => s.name).join(', ')}`;
     document.getElementById('sum-prefix').textContent = injectState.displayPrefix || '—';
     document.getElementById('sum-count').textContent  = injectState.selectedFiles.size.toString();
     document.getElementById('sum-files').innerHTML    = [...injectState.selectedFiles].map(f => `<code class="d-inline-block me-2 mb-1">${f}</code>`).join('');
@@ -401,16 +435,14 @@ let injectModal;
 
   // ----- DOM ready: build DataTable and wire handlers -----
   $(function () {
-    const rows = buildRows();
-
-    // DataTable init
+    // DataTable init (rows are added as prefix levels are fetched)
     const dt = $('#buildsTable').DataTable({
-      data: rows,
+      data: [],
       columns: [
         { data: null, orderable: false, className: 'dt-control', defaultContent: '' },
         { data: 'displayPrefix', render: d => `<span class="me-1">📁</span><code>${d}</code>` },
         { data: 'category' },
-        { data: 'files_count', className: 'text-end', render: d => d.toLocaleString() },
+        { data: 'files_count', className: 'text-end', render: d => (d === null ? '—' : d.toLocaleString()) },
         {
           data: null,
           orderable: false,
@@ -429,33 +461,107 @@ let injectModal;
       ],
       order: [[1, 'asc']],
       paging: true,
-      searching: true
+      searching: true,
+      language: { emptyTable: 'Loading…' }
     });
 
-    // Expand/collapse child rows
-    $('#buildsTable tbody').on('click', 'td.dt-control', function () {
+    const knownPrefixes = new Set();
+
+    function addFolderRows(prefixes) {
+      const fresh = prefixes.filter(p => !knownPrefixes.has(p));
+      fresh.forEach(p => knownPrefixes.add(p));
+      if (fresh.length) dt.rows.add(fresh.map(makeRow));
+    }
+
+    // Fetch the next page of a row's level, add its sub-folders as rows, redraw in place.
+    async function loadLevel(dtRow) {
+      const row = dtRow.data();
+      const folders = await fetchLevelPage(row);
+      addFolderRows(folders);
+      dtRow.invalidate();
+      dt.draw(false);
+    }
+
+    function showChild(dtRow, tr) {
+      dtRow.child(renderChild(dtRow.data())).show();
+      tr.addClass('shown');
+      hydrateMetaCellsFor(tr[0]); // fetch versions for this child panel
+    }
+
+    // Root level: files directly under LARS/ plus first-level folders
+    (async () => {
+      const rootRow = makeRow('');
+      knownPrefixes.add('');
+      const dtRoot = dt.row.add(rootRow);
+      try {
+        await loadLevel(dtRoot);
+        // Keep paging through root folders so every first-level prefix is listed
+        while (rootRow.nextToken) await loadLevel(dtRoot);
+      } catch (err) {
+        console.error('root level load failed:', err);
+        dt.draw(false);
+      }
+    })();
+
+    // Expand/collapse child rows (fetches the level on first expand)
+    $('#buildsTable tbody').on('click', 'td.dt-control', async function () {
       const tr  = $(this).closest('tr');
       const row = dt.row(tr);
       if (row.child.isShown()) {
         row.child.hide();
         tr.removeClass('shown');
-      } else {
-        row.child(renderChild(row.data())).show();
-        tr.addClass('shown');
-        hydrateMetaCellsFor(tr[0]); // fetch versions for this child panel
+        return;
+      }
+      if (!row.data().loaded) {
+        row.child('<div class="p-2 text-muted">Loading…</div>').show();
+        try {
+          await loadLevel(row);
+        } catch (err) {
+          row.child(`<div class="p-2 text-danger">Failed to load: ${err.message || err}</div>`).show();
+          return;
+        }
+      }
+      showChild(row, tr);
+    });
+
+    // Next page of files/folders for an expanded level
+    $('#buildsTable tbody').on('click', '.btn-load-more', async function () {
+      const childTr = $(this).closest('tr');
+      const tr  = childTr.prev('tr');
+      const row = dt.row(tr);
+      this.disabled = true;
+      try {
+        await loadLevel(row);
+        showChild(row, tr);
+      } catch (err) {
+        this.disabled = false;
+        console.error('load more failed:', err);
       }
     });
 
     // Open modal from Inject button
     $('#buildsTable tbody').on('click', '.btn-inject', async function () {
       const tr  = $(this).closest('tr');
-      const row = dt.row(tr).data();
+      const dtRow = dt.row(tr);
+      const row = dtRow.data();
+
+      if (!row.loaded) {
+        this.disabled = true;
+        try {
+          await loadLevel(dtRow);
+        } catch (err) {
+          this.disabled = false;
+          console.error('level load failed:', err);
+          return;
+        }
+        if (row.files_count === 0) return;
+      }
 
       injectState.displayPrefix = this.dataset.prefix || row.displayPrefix;
       injectState.keyPrefix     = this.dataset.keyprefix || row.keyPrefix;
       injectState.files         = (row.files || []).slice();
       injectState.selectedFiles = new Set();
-      injectState.selectedStack = null;
+      injectState.selectedStacks = new Map();
 
       // Header
       document.getElementById('inj-prefix').textContent = injectState.displayPrefix;
@@ -474,16 +580,23 @@ let injectModal;
       filterStacks(e.target.value);
     });
 
-    // Pick a stack (radio)
+    // Pick stacks (checkboxes)
     document.querySelector('#stacksTable tbody').addEventListener('change', (e) => {
-      if (e.target && e.target.name === 'stackPick') {
+      if (e.target && e.target.classList.contains('stackPick')) {
         const id = e.target.value;
         const tr = e.target.closest('tr');
-        injectState.selectedStack = {
-          id,
-          name:   tr.children[1].textContent,
-          region: tr.children[3].textContent
-        };
+        if (!e.target.checked) {
+          injectState.selectedStacks.delete(id);
+        } else if (injectState.selectedStacks.size >= MAX_INJECT_TARGETS) {
+          e.target.checked = false;
+          document.getElementById('inj-hint').textContent = `At most ${MAX_INJECT_TARGETS} stacks per inject.`;
+        } else {
+          injectState.selectedStacks.set(id, {
+            id,
+            name:   tr.children[1].textContent,
+            region: tr.children[3].textContent
+          });
+        }
       }
     });
 
@@ -493,8 +606,8 @@ let injectModal;
       const is2 = !document.getElementById('inj-step-2').classList.contains('d-none');
 
       if (is1) {
-        if (!injectState.selectedStack) {
-          document.getElementById('inj-hint').textContent = 'Please select a stack to continue.';
+        if (injectState.selectedStacks.size === 0) {
+          document.getElementById('inj-hint').textContent = 'Please select at least one stack to continue.';
           return;
         }
         renderFiles();
@@ -541,32 +654,43 @@ let injectModal;
     // Submit
     document.getElementById('inj-submit').addEventListener('click', async () => {
       // Build payload
-      const instanceId = injectState.selectedStack?.id;
-      const filesArr   = [...injectState.selectedFiles];
-      const keyPrefix  = injectState.keyPrefix; // "" or "MT/AUG/"
+      const stacks    = [...injectState.selectedStacks.values()];
+      const filesArr  = [...injectState.selectedFiles];
+      const keyPrefix = injectState.keyPrefix; // "" or "MT/AUG/"
 
       // Safety
-      if (!instanceId || filesArr.length === 0) return;
+      if (stacks.length === 0 || filesArr.length === 0) return;
 
       showProgressUI();
 
-      try {
-        const resp = await fetch('/api/inject', {
-          method: 'POST',
-          headers: {'Content-Type':'application/json'},
-          credentials: 'same-origin',
-          body: JSON.stringify({
-            instance_id: instanceId,
-            key_prefix: keyPrefix,
-            files: filesArr,
-            preclear: !!injectState.preclearEnabled
-          })
-        });
-        const data = await resp.json();
-        if (!resp.ok || !data.ok) throw new Error(data.error || `HTTP ${resp.status}`);
+      // One SendCommand per region covers every selected stack there
+      const byRegion = new Map();
+      stacks.forEach(s => {
+        if (!byRegion.has(s.region)) byRegion.set(s.region, []);
+        byRegion.get(s.region).push(s.id);
+      });
 
-        // Poll
-        await pollInjectStatus(data.job_id, data.instance_id);
+      try {
+        const jobs = await Promise.all([...byRegion].map(async ([region, ids]) => {
+          const resp = await fetch('/api/inject', {
+            method: 'POST',
+            headers: {'Content-Type':'application/json'},
+            credentials: 'same-origin',
+            body: JSON.stringify({
+              instance_ids: ids,
+              region: region,
+              key_prefix: keyPrefix,
+              files: filesArr,
+              preclear: !!injectState.preclearEnabled,
+              sync: document.getElementById('inj-sync').checked
+            })
+          });
+          const data = await resp.json();
+          if (!resp.ok || !data.ok) throw new Error(data.error || `HTTP ${resp.status}`);
+          return data;
+        }));
+
+        await followInject(jobs);
       } catch (err) {
         setProgressStatus('Failed', 'Failed to start', String(err));
         // enable Close
@@ -577,35 +701,69 @@ let injectModal;
       }
     });
 
-    async function pollInjectStatus(jobId, instanceId) {
+    function finishInject() {
       const submitBtn = document.getElementById('inj-submit');
-      let done = false;
-
-      while (!done) {
-        const r = await fetch(`/api/inject/${encodeURIComponent(jobId)}/status?instance_id=${encodeURIComponent(instanceId)}`, {
-          credentials: 'same-origin'
-        });
-        const j = await r.json();
-
-        if (!j.ok) {
-          setProgressStatus('Failed', 'Status error', j.error || '');
-          break;
-        }
+      submitBtn.disabled = false;
+      submitBtn.textContent = 'Close';
+      submitBtn.onclick = () => { injectModal.hide(); };
+    }
 
-        // Combine stdout/stderr for display
-        const out = [j.stdout || '', j.stderr || ''].filter(Boolean).join('\n');
-        setProgressStatus(j.status, j.status_details, out);
+    // Long-poll the server-side command tracker: each request returns as soon as
+    // the command's snapshot changes, so no fixed-interval polling per tab.
+    async function waitInject(job, since) {
+      const params = new URLSearchParams({ region: job.region, since: String(since), instance_ids: job.instance_ids.join(',') });
+      const r = await fetch(`/api/inject/${encodeURIComponent(job.job_id)}/wait?${params}`, { credentials: 'same-origin' });
+      const j = await r.json();
+      if (!r.ok || !j.ok) throw new Error(j.error || `HTTP ${r.status}`);
+      return j;
+    }
 
-        if (['Success','Failed','Cancelled','TimedOut'].includes(j.status)) {
-          done = true;
-          submitBtn.disabled = false;
-          submitBtn.textContent = 'Close';
-          submitBtn.onclick = () => { injectModal.hide(); };
-          break;
+    async function followInject(jobs) {
+      const names = new Map([...injectState.selectedStacks.values()].map(s => [s.id, s.name]));
+      const single = jobs.length === 1 && jobs[0].instance_ids.length === 1;
+      const snaps = new Map();
+
+      function render() {
+        const all = jobs.map(job => snaps.get(job.job_id)).filter(Boolean);
+        const done = all.length === jobs.length && all.every(j => j.done);
+        if (single) {
+          const inv = all[0]?.invocations[jobs[0].instance_id] || {};
+          const out = [inv.stdout || '', inv.stderr || ''].filter(Boolean).join('\n');
+          setProgressStatus(inv.status || 'Pending', inv.status_details, out);
+          return done;
         }
+        const invocations = Object.assign({}, ...all.map(j => j.invocations));
+        const counts = {};
+        all.forEach(j => Object.entries(j.counts).forEach(([st, n]) => { counts[st] = (counts[st] || 0) + n; }));
+        const status = !done ? 'InProgress'
+          : all.every(j => j.status === 'Success') ? 'Success' : 'Failed';
+        const details = Object.entries(counts).map(([st, n]) => `${st}: ${n}`).join(' · ') || 'Pending';
+        const out = jobs.flatMap(job => job.instance_ids).map(id => {
+          const inv = invocations[id];
+          return `== ${names.get(id) || id} (${id}): ${inv ? inv.status : 'Pending'} ==\n${inv ? inv.stdout : ''}`;
+        }).join('\n');
+        setProgressStatus(status, details, out);
+        return done;
+      }
 
-        await new Promise(res => setTimeout(res, 2000));
+      try {
+        await Promise.all(jobs.map(async job => {
+          let since = -1;
+          while (true) {
+            const j = await waitInject(job, since);
+            const changed = j.version !== since;
+            snaps.set(job.job_id, j);
+            since = j.version;
+            render();
+            if (j.done) break;
+            // the server only holds briefly (or not at all when busy); don't spin on unchanged snapshots
+            if (!changed) await new Promise(r => setTimeout(r, 2000));
+          }
+        }));
+      } catch (err) {
+        setProgressStatus('Failed', 'Status error', String(err));
       }
+      finishInject();
     }
 
 
@@ -620,4 +778,116 @@ let injectModal;
     document.getElementById('preclearAlert')
       .classList.toggle('d-none', !injectState.preclearEnabled);
   });
+
+  // ----- Admin: per-prefix usage + batched purge -----
+  const prefixAdminEl = document.getElementById('prefixAdminModal');
+  if (prefixAdminEl) {
+    const prefixAdminModal = bootstrap.Modal.getOrCreateInstance(prefixAdminEl);
+    const USAGE_URL = S3B.USAGE_URL || '/api/s3/prefix-usage';
+    const PURGE_URL = S3B.PURGE_URL || '/api/s3/purge';
+    const purgeBtn  = document.getElementById('pa-purge');
+    let usageByPrefix = new Map();
+
+    function fmtBytes(n) {
+      const units = ['B', 'KiB', 'MiB', 'GiB', 'TiB'];
+      let i = 0;
+      while (n >= 1024 && i < units.length - 1) { n /= 1024; i++; }
+      return `${n.toFixed(i ? 1 : 0)} ${units[i]}`;
+    }
+
+    function selectedPrefixes() {
+      return [...prefixAdminEl.querySelectorAll('.pa-pick:checked')].map(c => c.value);
+    }
+
+    function updatePurgeButton() {
+      const sel = selectedPrefixes();
+      purgeBtn.disabled = sel.length === 0;
+      const objs = sel.reduce((a, p) => a + (usageByPrefix.get(p)?.objects || 0), 0);
+      purgeBtn.textContent = sel.length ? `Purge ${sel.length} (${objs.toLocaleString()} objects)` : 'Purge selected';
+    }
+
+    async function loadUsage(refresh) {
+      const tbody = prefixAdminEl.querySelector('#pa-table tbody');
+      const sum   = document.getElementById('pa-summary');
+      tbody.innerHTML = `<tr><td colspan="5" class="text-muted">Scanning LARS/…</td></tr>`;
+      sum.textContent = 'Scanning…';
+      try {
+        const resp = await fetch(`${USAGE_URL}${refresh ? '?refresh=1' : ''}`, { credentials: 'same-origin' });
+        const data = await resp.json();
+        if (!resp.ok || !data.ok) throw new Error(data.error || `HTTP ${resp.status}`);
+
+        usageByPrefix = new Map(data.prefixes.map(u => [u.prefix, u]));
+        tbody.innerHTML = data.prefixes.map(u => `
+          <tr>
+            <td><input type="checkbox" class="pa-pick" value="${u.prefix}" aria-label="Select ${u.prefix}"></td>
+            <td><code>LARS/${u.prefix}</code></td>
+            <td class="text-end">${u.objects.toLocaleString()}</td>
+            <td class="text-end">${fmtBytes(u.bytes)}</td>
+            <td>${u.newest ? fmtLastMod(u.newest) : '—'}</td>
+          </tr>`).join('') || `<tr><td colspan="5" class="text-muted">No prefixes</td></tr>`;
+
+        const totalObjs  = data.prefixes.reduce((a, u) => a + u.objects, 0);
+        const totalBytes = data.prefixes.reduce((a, u) => a + u.bytes, 0);
+        sum.textContent = `${data.prefixes.length} prefixes · ${totalObjs.toLocaleString()} objects · ${fmtBytes(totalBytes)} (stalest first)`;
+      } catch (err) {
+        tbody.innerHTML = `<tr><td colspan="5" class="text-danger">Failed to load usage: ${err.message || err}</td></tr>`;
+        sum.textContent = '—';
+      }
+      updatePurgeButton();
+    }
+
+    async function pollPurge(jobId, expected) {
+      const bar   = document.getElementById('pa-progress-bar');
+      const label = document.getElementById('pa-progress-label');
+      const count = document.getElementById('pa-progress-count');
+      for (;;) {
+        const resp = await fetch(`${PURGE_URL}/${encodeURIComponent(jobId)}`, { credentials: 'same-origin' });
+        const job  = await resp.json();
+        if (!resp.ok || !job.ok) throw new Error(job.error || `HTTP ${resp.status}`);
+
+        const total = Math.max(expected, job.listed);
+        const pct   = total ? Math.round((job.deleted + job.failed) * 100 / total) : 100;
+        bar.style.width = `${pct}%`;
+        count.textContent = `${job.deleted.toLocaleString()} / ${total.toLocaleString()}${job.failed ? ` (${job.failed} failed)` : ''}`;
+        label.textContent = job.current ? `Purging LARS/${job.current}…` : `Purge ${job.state}`;
+
+        if (job.state !== 'running') return job;
+        await new Promise(res => setTimeout(res, 1000));
+      }
+    }
+
+    document.getElementById('btn-prefix-admin').addEventListener('click', () => {
+      document.getElementById('pa-progress').classList.add('d-none');
+      prefixAdminModal.show();
+      loadUsage(false);
+    });
+    document.getElementById('pa-rescan').addEventListener('click', () => loadUsage(true));
+    prefixAdminEl.addEventListener('change', (e) => {
+      if (e.target.classList.contains('pa-pick')) updatePurgeButton();
+    });
+
+    purgeBtn.addEventListener('click', async () => {
+      const prefixes = selectedPrefixes();
+      if (!prefixes.length) return;
+      const expected = prefixes.reduce((a, p) => a + (usageByPrefix.get(p)?.objects || 0), 0);
+      if (!confirm(`Permanently delete ${expected.toLocaleString()} objects under:\n${prefixes.map(p => 'LARS/' + p).join('\n')}`)) return;
+
+      purgeBtn.disabled = true;
+      document.getElementById('pa-progress').classList.remove('d-none');
+      try {
+        const resp = await fetch(PURGE_URL, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          credentials: 'same-origin',
+          body: JSON.stringify({ prefixes })
+        });
+        const data = await resp.json();
+        if (!resp.ok || !data.ok) throw new Error(data.error || `HTTP ${resp.status}`);
+        await pollPurge(data.job_id, expected);
+      } catch (err) {
+        document.getElementById('pa-progress-label').textContent = `Purge failed: ${err.message || err}`;
+      }
+      loadUsage(true);
+    });
+  }
 })();
@@ -579,3 +579,113 @@ $(function () {
     });
   });
 })();
+
+// ===== Pipeline (upload + inject into stacks, overlapped server-side) =====
+$(function () {
+  const $panel = $('#pipeline-panel');
+  if (!$panel.length) return;
+  const $form = $('#lars2awsForm');
+  const $alerts = $('#l2a-alerts');
+  const $tbody = $('#pipeline-stacks tbody');
+  const $start = $('#pipeline-start');
+  const picked = new Map();   // instance id -> {id, name, region}
+  let loaded = false;
+
+  const esc = s => String(s ?? '').replace(/[&<>"']/g, c => ({'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}[c]));
+  const secs = ms => (ms == null ? '—' : `${(ms / 1000).toFixed(1)}s`);
+
+  function updatePicked() {
+    $('#pipeline-picked').text(`${picked.size} selected`);
+  }
+
+  $panel.on('show.bs.collapse', async function () {
+    if (loaded) return;
+    try {
+      const resp = await fetch('/api/stacks?state=running', { credentials: 'same-origin' });
+      if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+      const list = await resp.json();
+      $tbody.html(list.map(s => `
+        <tr>
+          <td style="width:2.2rem;"><input type="checkbox" class="pipeline-pick" value="${esc(s.id)}"
+               data-name="${esc(s.name)}" data-region="${esc(s.region)}"></td>
+          <td>${esc(s.name)}</td><td><code>${esc(s.id)}</code></td><td>${esc(s.region)}</td>
+        </tr>`).join('') || '<tr><td class="text-muted">No running stacks.</td></tr>');
+      loaded = true;
+    } catch (err) {
+      $tbody.html(`<tr><td class="text-danger">Failed to load running stacks.</td></tr>`);
+    }
+  });
+
+  $tbody.on('change', '.pipeline-pick', function () {
+    if (this.checked) picked.set(this.value, { id: this.value, name: this.dataset.name, region: this.dataset.region });
+    else picked.delete(this.value);
+    updatePicked();
+  });
+
+  $('#pipeline-filter').on('input', function () {
+    const term = this.value.trim().toLowerCase();
+    $tbody.find('tr').each(function () {
+      $(this).toggleClass('d-none', !!term && !this.textContent.toLowerCase().includes(term));
+    });
+  });
+
+  function renderJob(job) {
+    const rows = (job.artifacts || []).map(a => `
+      <tr>
+        <td><code>${esc(a.name)}</code></td>
+        <td>${esc(a.upload)} <span class="text-muted">${secs(a.upload_ms)}</span></td>
+        <td>${esc(a.inject)} <span class="text-muted">${secs(a.inject_ms)}</span>${a.verified && a.verified !== 'sha256'
+          ? ` <span class="badge text-bg-warning" title="No sha256 from LARS; the download was not checksum-verified">${esc(a.verified)}</span>` : ''}</td>
+        <td class="text-danger small">${esc(a.error || '')}</td>
+      </tr>`).join('');
+    const st = job.stages || {};
+    const unverified = job.unverified || [];
+    const type = job.state === 'done' ? (unverified.length ? 'warning' : 'success') : (job.state === 'failed' ? 'warning' : 'info');
+    $alerts.html(`
+      <div class="alert alert-${type} alert-dismissible fade show" role="alert">
+        <div class="fw-semibold mb-2">Pipeline ${esc(job.state)} → ${job.path === 'direct' ? 'direct from LARS' : `<code>${esc(job.s3_prefix)}</code>`} on ${job.targets.length} stack(s)</div>
+        <div class="small mb-2">${job.path === 'direct'
+          ? `plan ${secs(st.plan_ms)} · checks ${secs(st.checks_ms)} · download ${secs(st.direct_ms)} · total ${secs(st.total_ms)}`
+          : `plan ${secs(st.plan_ms)} · preclear ${secs(st.preclear_ms)} · uploads ${secs(st.uploads_ms)} · total ${secs(st.total_ms)}`}</div>
+        <table class="table table-sm mb-0">
+          <thead><tr><th>Artifact</th><th>Upload</th><th>Inject</th><th></th></tr></thead>
+          <tbody>${rows || '<tr><td colspan="4" class="text-muted">Planning…</td></tr>'}</tbody>
+        </table>
+        ${unverified.length ? `<div class="small mt-1">Not checksum-verified (no sha256 from LARS): ${unverified.map(n => `<code>${esc(n)}</code>`).join(', ')}</div>` : ''}
+        ${(job.errors || []).map(e => `<div class="small text-danger mt-1">${esc(e)}</div>`).join('')}
+        <button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>
+      </div>`);
+  }
+
+  $start.on('click', async function () {
+    if (picked.size === 0) {
+      $alerts.html('<div class="alert alert-warning">Pick at least one target stack.</div>');
+      return;
+    }
+    const fd = new FormData($form[0]);
+    fd.set('targets', JSON.stringify([...picked.values()].map(t => ({ id: t.id, region: t.region }))));
+    fd.set('preclear', $('#pipeline-preclear').prop('checked') ? '1' : '0');
+    fd.set('path', $('#pipeline-path').val() || 's3');
+
+    $start.prop('disabled', true);
+    try {
+      const resp = await fetch('/lars2aws/pipeline', { method: 'POST', body: fd, credentials: 'same-origin' });
+      const data = await resp.json();
+      if (!resp.ok || !data.ok) throw new Error(data.message || data.error || `HTTP ${resp.status}`);
+
+      // Job state lives in memory on the server, so polling it costs no AWS calls
+      while (true) {
+        const r = await fetch(`/lars2aws/pipeline/${encodeURIComponent(data.job_id)}`, { credentials: 'same-origin' });
+        const job = await r.json();
+        if (!job.ok) throw new Error(job.error || `HTTP ${r.status}`);
+        renderJob(job);
+        if (job.state === 'done' || job.state === 'failed') break;
+        await new Promise(res => setTimeout(res, 1500));
+      }
+    } catch (err) {
+      $alerts.html(`<div class="alert alert-danger">Pipeline failed: ${esc(err.message)}</div>`);
+    } finally {
+      $start.prop('disabled', false);
+    }
+  });
+});
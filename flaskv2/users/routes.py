@@ -11,7 +11,7 @@ from flask import Blueprint, abort, current_app, flash, redirect, render_templat
 from flask_login import current_user, login_required, login_user, logout_user
 from flask_mail import Message
 
-from flaskv2.models import User
+from flaskv2.models import User, user_cache
 from flaskv2.users.forms import ForgotPasswordForm, LoginForm, RegistrationForm, ResetPasswordForm
 from flaskv2.utils.db import safe_commit
 from flaskv2.utils.timing import add_duration
@@ -137,6 +137,7 @@ def forgot_password():
             audit("password_reset_requested", outcome="error", target_user_id=user.id, reason="db_commit_failed")
             flash("An internal error occurred. Please try again later.", "danger")
             return redirect(url_for('users.forgot_password'))
+        user_cache.invalidate(user.id)
 
         token = user.get_reset_token()
         link = url_for('users.reset_password', token=token, _external=True)
@@ -252,6 +253,7 @@ def delete_user(user_id):
         audit("delete_user", outcome="error", target_user_id=user.id, reason="db_commit_failed")
         flash("An internal error occurred. Please try again later.", "danger")
         return redirect(url_for("main.user_list"))
+    user_cache.invalidate(user.id)
 
     current_app.app_log.info("delete_user", extra={"target_user_id": user.id})
     audit("delete_user", outcome="success", target_user_id=user.id, target_username=user.username)
@@ -273,6 +275,7 @@ def grant_admin(user_id):
         audit("grant_admin", outcome="error", target_user_id=user.id, reason="db_commit_failed")
         flash("An internal error occurred. Please try again later.", "danger")
         return redirect(url_for("main.user_list"))
+    user_cache.invalidate(user.id)
 
     current_app.app_log.info("grant_admin", extra={"target_user_id": user.id})
     audit("grant_admin", outcome="success", target_user_id=user.id, target_username=user.username)
@@ -304,6 +307,7 @@ def remove_admin(user_id):
             audit("revoke_admin", outcome="error", target_user_id=user.id, reason="db_commit_failed")
             flash("An internal error occurred. Please try again later.", "danger")
             return redirect(url_for("main.user_list"))
+        user_cache.invalidate(user.id)
         current_app.app_log.info("revoke_admin", extra={"target_user_id": user.id})
         audit("revoke_admin", outcome="success", target_user_id=user.id, target_username=user.username)
         flash(f"Removed admin privileges from {user.username}.", "success")
@@ -342,6 +346,7 @@ def reset_password(token):
             audit("reset_password", outcome="error", target_user_id=user.id, reason="db_commit_failed")
             flash("An internal error occurred. Please try again later.", "danger")
             return redirect(url_for('users.reset_password', token=token))
+        user_cache.invalidate(user.id)
 
         current_app.app_log.info("reset_password_success", extra={"target_user_id": user.id})
         audit("reset_password", outcome="success", target_user_id=user.id)
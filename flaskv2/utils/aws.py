@@ -0,0 +1,256 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+# One boto3 session + one client per (service, region) for the whole process.
+# Clients are thread-safe once built; building them (credential/endpoint
+# resolution, loading service models) is not, so creation happens under a lock.
+_lock = threading.Lock()
+_session: Optional[boto3.session.Session] = None
+_clients: Dict[Tuple[str, str], Any] = {}
+
+_settings: Dict[str, Any] = {
+    "max_pool_connections": 32,
+    "connect_timeout": 5,
+    "read_timeout": 30,
+    "retry_mode": "standard",
+    "max_attempts": 5,
+}
+
+
+# ---------- Throttling governor ----------
+
+# Error codes AWS services use for request-rate throttling
+THROTTLE_CODES = {
+    "Throttling", "ThrottlingException", "ThrottledException", "RequestThrottledException",
+    "TooManyRequestsException", "RequestLimitExceeded", "RequestThrottled", "SlowDown",
+    "EC2ThrottledException", "ProvisionedThroughputExceededException", "BandwidthLimitExceeded",
+}
+
+# (rate per second, burst). Looked up as "service.Operation", then "service", then "*".
+# Conservative defaults; override with AWS_RATE_LIMITS.
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "*": (20.0, 40),
+    "s3": (200.0, 400),
+    "ssm.SendCommand": (5.0, 10),
+    "ssm.GetCommandInvocation": (10.0, 20),
+}
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every thread calling one AWS API.
+    Callers reserve a token (the balance may go negative, which is the queue)
+    and sleep outside the lock. The refill rate is AIMD-adaptive: it halves on
+    each throttle and creeps back to the configured ceiling on success.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.max_rate = float(rate)
+        self.min_rate = max(0.2, self.max_rate / 32)
+        self.rate = self.max_rate
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        # metrics
+        self.calls = 0
+        self.queued = 0
+        self.waiting = 0
+        self.wait_ms = 0.0
+        self.throttled = 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            self.calls += 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            if wait:
+                self.queued += 1
+                self.waiting += 1
+                self.wait_ms += wait * 1000
+        if wait:
+            time.sleep(wait)
+            with self.lock:
+                self.waiting -= 1
+        return wait
+
+    def on_throttle(self) -> None:
+        with self.lock:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0)   # drain: everyone queues behind the backoff
+
+    def on_success(self) -> None:
+        if self.rate < self.max_rate:
+            with self.lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "rate": round(self.rate, 3),
+                "max_rate": self.max_rate,
+                "burst": self.burst,
+                "calls": self.calls,
+                "queued": self.queued,
+                "waiting": self.waiting,
+                "wait_ms_total": round(self.wait_ms, 1),
+                "throttled": self.throttled,
+            }
+
+
+class Governor:
+    """Process-wide registry of TokenBuckets keyed by 'service.Operation'."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.limits: Dict[str, Tuple[float, int]] = dict(DEFAULT_RATE_LIMITS)
+
+    def configure(self, limits: Dict[str, Tuple[float, int]]) -> None:
+        with self._lock:
+            self.limits = {**DEFAULT_RATE_LIMITS, **limits}
+            self._buckets.clear()
+
+    def bucket(self, service: str, operation: str) -> TokenBucket:
+        key = f"{service}.{operation}"
+        b = self._buckets.get(key)
+        if b is None:
+            with self._lock:
+                b = self._buckets.get(key)
+                if b is None:
+                    rate, burst = self.limits.get(key) or self.limits.get(service) or self.limits["*"]
+                    b = self._buckets[key] = TokenBucket(rate, burst)
+        return b
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {k: b.snapshot() for k, b in sorted(buckets.items())}
+
+
+governor = Governor()
+
+
+def parse_rate_limits(spec: str | None) -> Dict[str, Tuple[float, int]]:
+    """'ec2.DescribeInstances=5:10,s3=100:200' -> {"ec2.DescribeInstances": (5.0, 10), ...}"""
+    out: Dict[str, Tuple[float, int]] = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        key, val = item.split("=", 1)
+        rate, _, burst = val.partition(":")
+        try:
+            out[key.strip()] = (float(rate), int(burst or max(1, round(float(rate) * 2))))
+        except ValueError:
+            continue
+    return out
+
+
+def _split_event(event_name: str) -> Tuple[str, str]:
+    # e.g. "before-send.ec2.DescribeInstances" -> ("ec2", "DescribeInstances")
+    parts = event_name.split(".")
+    return (parts[1], parts[2]) if len(parts) >= 3 else ("*", "*")
+
+
+def _govern_before_send(event_name: str = "", **kwargs):
+    # Fires once per HTTP attempt (retries included), so backoff applies to retries too
+    governor.bucket(*_split_event(event_name)).acquire()
+    return None   # never short-circuit the request
+
+
+def _govern_needs_retry(event_name: str = "", response=None, **kwargs):
+    if response is None:
+        return None
+    http_response, parsed = response
+    code = ((parsed or {}).get("Error") or {}).get("Code")
+    bucket = governor.bucket(*_split_event(event_name))
+    if code in THROTTLE_CODES or getattr(http_response, "status_code", None) == 429:
+        bucket.on_throttle()
+    elif code is None:
+        bucket.on_success()
+    return None   # leave the retry decision to botocore
+
+
+def _register_governor(client) -> None:
+    events = client.meta.events
+    events.register("before-send", _govern_before_send, unique_id="flaskv2-governor-send")
+    # register_first: botocore's retry handler would otherwise answer first and hide throttles
+    events.register_first("needs-retry", _govern_needs_retry, unique_id="flaskv2-governor-retry")
+
+
+def aws_metrics() -> Dict[str, Dict[str, Any]]:
+    """Per 'service.Operation' governor metrics (rate, queued, throttled, ...)."""
+    return governor.metrics()
+
+
+def init_aws(app) -> None:
+    """
+    Apply AWS client settings from app.config and drop any clients built with
+    older settings. Pool size defaults to web threads x S3 transfer threads so
+    concurrent uploads from every request thread never wait on a connection.
+    """
+    cfg = app.config
+    web_threads = int(cfg.get("WEB_THREADS") or os.getenv("WEB_THREADS", 8))
+    transfer_threads = int(cfg.get("S3_MAX_CONCURRENCY", 4))
+    with _lock:
+        _settings.update(
+            max_pool_connections=int(cfg.get("AWS_MAX_POOL_CONNECTIONS") or max(10, web_threads * transfer_threads)),
+            connect_timeout=int(cfg.get("AWS_CONNECT_TIMEOUT", _settings["connect_timeout"])),
+            read_timeout=int(cfg.get("AWS_READ_TIMEOUT", _settings["read_timeout"])),
+            retry_mode=cfg.get("AWS_RETRY_MODE", _settings["retry_mode"]),
+            max_attempts=int(cfg.get("AWS_MAX_ATTEMPTS", _settings["max_attempts"])),
+        )
+        _clients.clear()
+    governor.configure(parse_rate_limits(cfg.get("AWS_RATE_LIMITS")))
+
+
+def client_config() -> Config:
+    return Config(
+        max_pool_connections=_settings["max_pool_connections"],
+        connect_timeout=_settings["connect_timeout"],
+        read_timeout=_settings["read_timeout"],
+        retries={"mode": _settings["retry_mode"], "max_attempts": _settings["max_attempts"]},
+    )
+
+
+def get_client(service: str, region: str | None = None):
+    """
+    Shared, pooled boto3 client for (service, region).
+    region=None resolves the default region (env/profile) once, like boto3.client().
+    Every request made through it passes the process-wide throttling governor.
+    """
+    key = (service, region or "")
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    global _session
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            if _session is None:
+                _session = boto3.session.Session()
+            client = _session.client(service, region_name=region, config=client_config())
+            _register_governor(client)
+            _clients[key] = client
+    return client
+
+
+def clear_clients() -> None:
+    """Forget cached clients (e.g. after credentials rotate)."""
+    global _session
+    with _lock:
+        _clients.clear()
+        _session = None
@@ -0,0 +1,96 @@
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from flask import current_app
+
+
+class PeriodicTask:
+    """
+    Run fn() every `interval` seconds on a daemon thread, inside an app context.
+    start() is idempotent, so callers can start lazily on first use.
+    trigger() runs the next iteration immediately.
+
+    Usage:
+        task = PeriodicTask("stack-inventory", refresh_all, interval=60)
+        task.start(current_app._get_current_object())
+    """
+
+    def __init__(self, name: str, fn: Callable[[], None], interval: float):
+        self.name = name
+        self.fn = fn
+        self.interval = float(interval)
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, app, *, run_first: bool = False) -> None:
+        """run_first=False waits one interval before the first run (caller already has fresh data)."""
+        with self._lock:
+            if self.running:
+                return
+            self._app = app
+            self._stop.clear()
+            if run_first:
+                self._wake.set()
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def trigger(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def _loop(self) -> None:
+        app = self._app
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                with app.app_context():
+                    self.fn()
+            except Exception:
+                # Never let one failed refresh kill the worker; try again next interval
+                app.logger.exception("periodic_task_failed: %s", self.name)
+
+
+_waiter_lock = threading.Lock()
+_waiter_slots: Optional[threading.BoundedSemaphore] = None
+
+
+@contextmanager
+def long_poll_slot():
+    """
+    Yield True if this request may block in a long-poll, False if it should
+    answer right away. Caps the request threads parked in long-polls across
+    all endpoints at LONG_POLL_MAX_WAITERS, so open pages can never tie up
+    the whole waitress pool (WEB_THREADS).
+
+    Usage:
+        with long_poll_slot() as may_wait:
+            snap = tracker.wait(cid, since, timeout=wait_seconds if may_wait else 0)
+    """
+    global _waiter_slots
+    size = int(current_app.config.get("LONG_POLL_MAX_WAITERS", 2))
+    if size <= 0:
+        yield False
+        return
+    with _waiter_lock:
+        if _waiter_slots is None:
+            _waiter_slots = threading.BoundedSemaphore(size)
+    acquired = _waiter_slots.acquire(blocking=False)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            _waiter_slots.release()
@@ -15,6 +15,9 @@ TMP_BUILDS_CLEAR_LIST = [
 
 TMP_BUILDS_FILTER_REGEX = r"Install-.*\.jar|mt_dependencies\.txt|MIG_scripts\.jar|LANDMARK\.jar|grid-installer\.jar"
 
+# One inject SendCommand targets at most this many instances (AWS InstanceIds limit)
+INJECT_MAX_INSTANCES = 50
+
 # --------------------------------------------------------
 # --------------------------------------------------------
 # --------------------------------------------------------
\ No newline at end of file
@@ -1,16 +1,26 @@
+import atexit
 import json
+import queue
 import subprocess
-from typing import Any, Dict, List, Optional
-import boto3
+from typing import Any, Dict, List, Optional, Tuple
 import csv, io, requests, os, re
 import shlex
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from flask import current_app
 from flaskv2.extensions import cache
+from flaskv2.utils.aws import get_client
+from flaskv2.utils.s3_zip import read_jar_version
+from flaskv2.utils.ssm import SHA256_RE
+from flaskv2.utils.stack_model import LANDMARK_ROLE, REQUIRED_ROLES, RoleInstance, Stack, StackView, classify_stack
 from datetime import datetime, timezone
 from dateutil.relativedelta import relativedelta  # pip install python-dateutil
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from collections import defaultdict
+from botocore.exceptions import ClientError
 
 MATURITY = {
     "R":  "Released",
@@ -206,8 +216,8 @@ if "_uploader_session" not in globals():
     _uploader_session = requests.Session()
 
 def _s3_client():
-    # AWS creds resolved by your staging setup (env/role)
-    return boto3.client("s3", region_name=current_app.config.get("AWS_REGION"))
+    # AWS creds resolved by your staging setup (env/role); shared pooled client
+    return get_client("s3", current_app.config.get("AWS_REGION"))
 
 def _s3_transfer_config():
     chunk_mb = int(current_app.config.get("S3_MULTIPART_CHUNK_MB", 16))
@@ -370,6 +380,48 @@ def plan_artifacts(app_name: str, stream: str, build_version: str, *, suffix_pre
     return plan
 
 
+def lars_source_checks(plan: list[dict]) -> Dict[str, Tuple[int | None, str | None]]:
+    """
+    {dest filename: (size, sha256)} for the direct-from-LARS inject mode.
+    Size comes from a HEAD on each source_url; sha256 from a sidecar file
+    (source_url + LARS_CHECKSUM_SUFFIX, e.g. ".sha256") when that is configured.
+    Anything LARS does not tell us is None and simply not checked on the host;
+    a sidecar that is not a 64-digit hex sha256 is logged and treated as missing.
+    """
+    suffix = current_app.config.get("LARS_CHECKSUM_SUFFIX") or ""
+
+    def check(item: dict):
+        url = item["source_url"]
+        size = sha = None
+        try:
+            r = _uploader_session.head(url, timeout=30, allow_redirects=True)
+            r.raise_for_status()
+            size = int(r.headers["Content-Length"]) if r.headers.get("Content-Length") else None
+        except Exception:
+            current_app.logger.warning("lars_head_failed: %s", url)
+        if suffix:
+            try:
+                r = _uploader_session.get(url + suffix, timeout=30)
+                r.raise_for_status()
+                sha = (r.text.split() or [""])[0].lower()
+            except Exception:
+                current_app.logger.warning("lars_checksum_missing: %s", url + suffix)
+            if sha is not None and not SHA256_RE.fullmatch(sha):
+                current_app.logger.warning("lars_checksum_invalid: %s", url + suffix)
+                sha = None
+        return item["key"].rsplit("/", 1)[-1], (size, sha)
+
+    if not plan:
+        return {}
+    app = current_app._get_current_object()
+
+    def check_in_app(item: dict):
+        with app.app_context():
+            return check(item)
+
+    with ThreadPoolExecutor(max_workers=min(8, len(plan))) as pool:
+        return dict(pool.map(check_in_app, plan))
+
 def upload_plan(plan: list[dict]) -> list[dict]:
     """
     Execute uploads; return [{source_url, bucket, key, ok, error?}]
@@ -424,6 +476,158 @@ def _find_powershell():
 
 PS_EXE = _find_powershell()
 
+
+class WorkerError(RuntimeError):
+    """A pooled worker timed out, crashed or answered with something unusable."""
+
+
+class _LineWorker:
+    """One external process speaking JSON lines; a reader thread feeds stdout into a queue (works for Windows pipes too)."""
+
+    def __init__(self, argv: List[str]):
+        self.proc = subprocess.Popen(
+            argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding="utf-8", errors="replace", bufsize=1, creationflags=CREATE_NO_WINDOW,
+        )
+        self.requests = 0
+        self._lines: "queue.Queue[str | None]" = queue.Queue()
+        threading.Thread(target=self._read, name=f"worker-reader-{self.proc.pid}", daemon=True).start()
+
+    def _read(self) -> None:
+        for line in self.proc.stdout:
+            self._lines.put(line)
+        self._lines.put(None)   # EOF: the process exited
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def call(self, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        self.requests += 1
+        try:
+            self.proc.stdin.write(json.dumps(request) + "\n")
+            self.proc.stdin.flush()
+        except OSError as e:
+            raise WorkerError(f"worker stdin closed: {e}") from e
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self._lines.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                raise WorkerError(f"no response within {timeout}s") from None
+            if line is None:
+                try:
+                    rc = self.proc.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    rc = None
+                raise WorkerError(f"worker exited (rc={rc})")
+            try:
+                resp = json.loads(line)
+            except ValueError:
+                continue    # stray non-JSON output
+            if isinstance(resp, dict) and resp.get("id") == request["id"]:
+                return resp
+
+    def kill(self) -> None:
+        try:
+            self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+
+
+class JsonLineWorkerPool:
+    """
+    Up to `size` long-lived interpreter processes (argv), reused across calls
+    so interpreter startup and module imports are paid once per worker.
+
+    Protocol: one JSON object per line each way. call(payload) sends
+    {"id": n, **payload} and returns the response line carrying the same id.
+    A worker that times out, crashes or closes its pipes is killed and
+    replaced on the next call; workers are also recycled after
+    `max_requests` calls. Any process that follows the protocol works, e.g.
+    ps1_scripts/worker.ps1 or the stand-in tests/fixtures/json_line_worker.py.
+    """
+
+    def __init__(self, argv: List[str], *, size: int = 2, timeout: float = 60, max_requests: int = 500):
+        self.argv = list(argv)
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_requests = max_requests
+        self._idle: List[_LineWorker] = []
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._ids = 0
+        self._closed = False
+
+    def call(self, payload: Dict[str, Any], *, timeout: float | None = None) -> Dict[str, Any]:
+        if self._closed:
+            raise WorkerError("pool is closed")
+        timeout = self.timeout if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise WorkerError(f"no free worker within {timeout}s")
+        worker = None
+        try:
+            with self._lock:
+                self._ids += 1
+                request = {**payload, "id": self._ids}
+                while self._idle and worker is None:
+                    w = self._idle.pop()
+                    if w.alive:
+                        worker = w
+                    else:
+                        w.kill()
+            if worker is None:
+                try:
+                    worker = _LineWorker(self.argv)
+                except OSError as e:
+                    raise WorkerError(f"cannot start worker: {e}") from e
+            try:
+                resp = worker.call(request, timeout)
+            except WorkerError:
+                worker.kill()
+                worker = None
+                raise
+            return resp
+        finally:
+            if worker is not None:
+                with self._lock:
+                    if self._closed or not worker.alive or worker.requests >= self.max_requests:
+                        worker.kill()
+                    else:
+                        self._idle.append(worker)
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for w in idle:
+            w.kill()
+
+
+_ps_pool: JsonLineWorkerPool | None = None
+_ps_pool_lock = threading.Lock()
+
+
+def _get_ps_pool() -> JsonLineWorkerPool | None:
+    """Shared PowerShell worker pool, or None when PS_WORKERS is 0."""
+    global _ps_pool
+    size = int(current_app.config.get("PS_WORKERS", 2))
+    if size <= 0:
+        return None
+    with _ps_pool_lock:
+        if _ps_pool is None:
+            worker_ps1 = os.path.join(current_app.root_path, "ps1_scripts", "worker.ps1")
+            _ps_pool = JsonLineWorkerPool(
+                [PS_EXE, "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-File", worker_ps1],
+                size=size,
+                timeout=int(current_app.config.get("PS_WORKER_TIMEOUT", 120)),
+            )
+            atexit.register(_ps_pool.close)
+        return _ps_pool
+
+
 def _get_ps1_path():
     local = os.path.join(current_app.root_path, "ps1_scripts", "fetch_jobs.ps1")
     return local
@@ -435,6 +639,18 @@ def _run_ps1_and_parse(prefix="PSSC-"):
         current_app.logger.warning("ps1_not_found")
         return None
 
+    pool = _get_ps_pool()
+    if pool is not None:
+        try:
+            resp = pool.call({"script": ps1, "args": {"Prefix": prefix}})
+            if resp.get("ok"):
+                data = json.loads(resp.get("output") or "[]")
+                return [data] if isinstance(data, dict) else data
+            current_app.logger.warning("ps1_worker_failed: %s", resp.get("error"))
+        except (WorkerError, ValueError) as e:
+            current_app.logger.warning("ps1_worker_failed: %s", e)
+        # fall through to a one-off powershell.exe
+
     cmd = [
         PS_EXE, "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass",
         "-File", ps1, "-Prefix", prefix,
@@ -583,7 +799,7 @@ def s3_build_prefix_index(bucket: str = "migops", root: str = "LARS/") -> Dict[s
       }
     Scans only within LARS/: root, first-level prefixes, and their subprefixes.
     """
-    s3 = boto3.client("s3")
+    s3 = _s3_client()
     out: Dict[str, List[str]] = defaultdict(list)
     paginator = s3.get_paginator("list_objects_v2")
 
@@ -630,6 +846,235 @@ def s3_build_prefix_index(bucket: str = "migops", root: str = "LARS/") -> Dict[s
     return {k: sorted(v) for k, v in out.items()}
 
 
+def _normalize_rel_prefix(rel_prefix: str) -> str:
+    """
+    Normalize a UI-supplied prefix relative to the S3 root.
+    '' -> '' (root), 'MT' / '/MT/' -> 'MT/'. Rejects path tricks like '..'.
+    """
+    rel = (rel_prefix or "").strip().lstrip("/")
+    if not rel:
+        return ""
+    if any(part in ("", ".", "..") for part in rel.rstrip("/").split("/")):
+        raise ValueError(f"invalid prefix: {rel_prefix!r}")
+    return rel if rel.endswith("/") else f"{rel}/"
+
+def s3_list_prefix_level(
+    *,
+    bucket: str = "migops",
+    root: str = "LARS/",
+    rel_prefix: str = "",
+    continuation_token: str | None = None,
+    page_size: int | None = None,
+) -> Dict[str, Any]:
+    """
+    List ONE level under root+rel_prefix (Delimiter='/'), one page at a time.
+    Returns:
+      {
+        "prefix": "MT/",                                   # relative to root
+        "folders": [{"name": "AUG", "prefix": "MT/AUG/"}],
+        "files": [{"name": "foo.jar", "size": 123, "last_modified": "...Z"}],
+        "folder_count": 1, "file_count": 1,                # counts for this page
+        "next_token": "..." | None,                        # pass back as continuation_token
+      }
+    Cost is bounded by page_size, not by the number of keys under the prefix.
+    """
+    rel = _normalize_rel_prefix(rel_prefix)
+    full_prefix = f"{root}{rel}"
+    if page_size is None:
+        page_size = int(current_app.config.get("S3_TREE_PAGE_SIZE", 200))
+    page_size = max(1, min(int(page_size), 1000))
+
+    params: Dict[str, Any] = {
+        "Bucket": bucket,
+        "Prefix": full_prefix,
+        "Delimiter": "/",
+        "MaxKeys": page_size,
+    }
+    if continuation_token:
+        params["ContinuationToken"] = continuation_token
+
+    resp = _s3_client().list_objects_v2(**params)
+
+    folders = []
+    for cp in resp.get("CommonPrefixes", []):
+        child = cp["Prefix"][len(root):]                   # e.g. "MT/AUG/"
+        folders.append({"name": child[len(rel):].strip("/"), "prefix": child})
+
+    files = []
+    for obj in resp.get("Contents", []):
+        name = obj["Key"][len(full_prefix):]
+        if not name or name.endswith("/"):
+            continue                                       # skip folder markers
+        lm = obj.get("LastModified")
+        files.append({
+            "name": name,
+            "size": int(obj.get("Size") or 0),
+            "last_modified": lm.astimezone(timezone.utc).isoformat().replace("+00:00", "Z") if lm else None,
+        })
+
+    return {
+        "prefix": rel,
+        "folders": folders,
+        "files": files,
+        "folder_count": len(folders),
+        "file_count": len(files),
+        "next_token": resp.get("NextContinuationToken") if resp.get("IsTruncated") else None,
+    }
+
+
+def s3_prefix_usage(bucket: str = "migops", root: str = "LARS/", *, force_refresh: bool = False) -> List[Dict[str, Any]]:
+    """
+    One flat scan of root, aggregated per first-level upload folder (LARS/<suffix>/):
+      [{"prefix": "MT/", "objects": 12, "bytes": 345, "newest": "...Z"}, ...]
+    Stalest folders first. Cached briefly; purges invalidate it.
+    """
+    key = f"s3_usage:v1:{bucket}:{root}"
+    if not force_refresh:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    usage: Dict[str, Dict[str, Any]] = {}
+    paginator = _s3_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=root):
+        for obj in page.get("Contents", []):
+            rel = obj["Key"][len(root):]
+            if "/" not in rel:
+                continue                                   # files directly under LARS/ are not a folder
+            prefix = rel.split("/", 1)[0] + "/"
+            u = usage.setdefault(prefix, {"prefix": prefix, "objects": 0, "bytes": 0, "newest": None})
+            u["objects"] += 1
+            u["bytes"] += int(obj.get("Size") or 0)
+            lm = obj.get("LastModified")
+            if lm and (u["newest"] is None or lm > u["newest"]):
+                u["newest"] = lm
+
+    out = sorted(usage.values(), key=lambda u: (u["newest"] is not None, u["newest"] or 0))
+    for u in out:
+        if u["newest"]:
+            u["newest"] = u["newest"].astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+    cache.set(key, out, timeout=int(current_app.config.get("S3_USAGE_TTL", 300)))
+    return out
+
+
+# In-process registry of purge jobs: {job_id: progress dict}
+_purge_jobs: Dict[str, Dict[str, Any]] = {}
+_purge_lock = threading.Lock()
+
+
+def prune_finished_jobs(jobs: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Drop finished jobs older than JOB_RETENTION_SECONDS, and the oldest
+    finished ones beyond JOB_RETENTION_MAX, from an in-process job registry.
+    Running jobs are never dropped. Call with the registry's lock held.
+    """
+    ttl = int(current_app.config.get("JOB_RETENTION_SECONDS", 3600))
+    keep = int(current_app.config.get("JOB_RETENTION_MAX", 100))
+    now = time.time()
+    finished = sorted(
+        (job["finished_at"], job_id) for job_id, job in jobs.items() if job.get("finished_at")
+    )
+    for n, (finished_at, job_id) in enumerate(finished):
+        if now - finished_at > ttl or len(finished) - n > keep:
+            del jobs[job_id]
+
+S3_DELETE_BATCH = 1000  # delete_objects hard limit per request
+
+def _purge_update(job_id: str, **changes):
+    with _purge_lock:
+        job = _purge_jobs[job_id]
+        for k, v in changes.items():
+            job[k] = job[k] + v if k in ("listed", "deleted", "failed") else v
+
+def _purge_batch(s3, job_id: str, bucket: str, keys: List[str]):
+    resp = s3.delete_objects(Bucket=bucket, Delete={"Objects": [{"Key": k} for k in keys], "Quiet": True})
+    errors = resp.get("Errors", [])
+    _purge_update(job_id, deleted=len(keys) - len(errors), failed=len(errors))
+    if errors:
+        with _purge_lock:
+            _purge_jobs[job_id]["errors"].extend(
+                f"{e.get('Key')}: {e.get('Code')}" for e in errors[:20]
+            )
+
+def _run_prefix_purge(app, job_id: str, bucket: str, root: str, prefixes: List[str], workers: int):
+    with app.app_context():
+        s3 = _s3_client()
+        paginator = s3.get_paginator("list_objects_v2")
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = []
+                for rel in prefixes:
+                    _purge_update(job_id, current=rel)
+                    batch: List[str] = []
+                    for page in paginator.paginate(Bucket=bucket, Prefix=f"{root}{rel}"):
+                        for obj in page.get("Contents", []):
+                            batch.append(obj["Key"])
+                            if len(batch) == S3_DELETE_BATCH:
+                                futures.append(pool.submit(_purge_batch, s3, job_id, bucket, batch))
+                                batch = []
+                        _purge_update(job_id, listed=len(page.get("Contents", [])))
+                    if batch:
+                        futures.append(pool.submit(_purge_batch, s3, job_id, bucket, batch))
+                for f in as_completed(futures):
+                    f.result()
+            _purge_update(job_id, state="done", current=None)
+        except Exception as e:
+            app.logger.exception("s3_prefix_purge_failed", extra={"job_id": job_id})
+            _purge_update(job_id, state="error", current=None, error=str(e))
+        finally:
+            _purge_update(job_id, finished_at=time.time())
+            cache.delete(f"s3_usage:v1:{bucket}:{root}")
+            job = get_prefix_purge(job_id)
+            app.audit.info(
+                "s3_prefix_purge.finished",
+                extra={k: job[k] for k in ("job_id", "state", "prefixes", "deleted", "failed")},
+            )
+
+def start_prefix_purge(*, bucket: str, root: str, prefixes: List[str], actor: str | None = None) -> str:
+    """
+    Delete every object under each root+prefix in the background.
+    Keys are listed per prefix and removed with delete_objects in batches of
+    1000 on a small thread pool. Returns a job id for get_prefix_purge().
+    """
+    rels = sorted({_normalize_rel_prefix(p) for p in prefixes})
+    if not rels or "" in rels:
+        raise ValueError("refusing to purge the LARS/ root")
+
+    job_id = uuid.uuid4().hex
+    with _purge_lock:
+        prune_finished_jobs(_purge_jobs)
+        _purge_jobs[job_id] = {
+            "job_id": job_id,
+            "state": "running",
+            "prefixes": rels,
+            "current": None,
+            "listed": 0,
+            "deleted": 0,
+            "failed": 0,
+            "errors": [],
+            "error": None,
+            "actor": actor,
+            "started_at": time.time(),
+            "finished_at": None,
+        }
+
+    workers = int(current_app.config.get("S3_PURGE_WORKERS", 4))
+    app = current_app._get_current_object()
+    threading.Thread(
+        target=_run_prefix_purge,
+        args=(app, job_id, bucket, root, rels, workers),
+        name=f"s3-purge-{job_id[:8]}",
+        daemon=True,
+    ).start()
+    return job_id
+
+def get_prefix_purge(job_id: str) -> Optional[Dict[str, Any]]:
+    with _purge_lock:
+        job = _purge_jobs.get(job_id)
+        return dict(job, errors=list(job["errors"])) if job else None
+
+
 # test
 def build_prefix_index_from_keys(keys: list[str]) -> dict[str, list[str]]:
     """
@@ -694,9 +1139,11 @@ def get_object_version_meta(bucket: str, root: str, rel_key: str) -> Optional[Di
     Return {"version": <str|None>, "last_modified": <iso8601|None>}.
     - Always attempts a HEAD on the object to read Last-Modified (for ALL files).
     - "version" is only populated for files in TARGET_META_FILES (else None).
+    - Jars uploaded without 'version' metadata fall back to pom.properties /
+      MANIFEST.MF read with ranged GETs (cached by ETag, see utils/s3_zip.py).
     rel_key is relative to `root` (e.g., 'MT/AUG/Install-LMMIG.jar').
     """
-    s3 = boto3.client("s3")
+    s3 = _s3_client()
     full_key = f"{root}{rel_key}"
     try:
         resp = s3.head_object(Bucket=bucket, Key=full_key)
@@ -716,135 +1163,349 @@ def get_object_version_meta(bucket: str, root: str, rel_key: str) -> Optional[Di
     basename = os.path.basename(rel_key)
     meta = resp.get("Metadata") or {}
     version = meta.get("version") if basename in TARGET_META_FILES else None
-    
+
+    if version is None and basename in TARGET_META_FILES and basename.endswith(".jar"):
+        version = read_jar_version(
+            s3, bucket, full_key,
+            size=int(resp.get("ContentLength") or 0),
+            etag=resp.get("ETag") or "",
+        )
+
     return {"version": version, "last_modified": last_modified}
 
+def s3_object_signatures(bucket: str, root: str, rel_keys: List[str]) -> Dict[str, Tuple[int, str]]:
+    """
+    {rel_key: (size, etag)} from concurrent HEADs, for the inject sync mode.
+    Keys that cannot be read are left out (the inject then always copies them).
+    """
+    s3 = _s3_client()
+
+    def head(rel_key: str):
+        try:
+            resp = s3.head_object(Bucket=bucket, Key=f"{root}{rel_key}")
+        except ClientError:
+            return rel_key, None
+        return rel_key, (int(resp.get("ContentLength") or 0), (resp.get("ETag") or "").strip('"'))
+
+    if not rel_keys:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(8, len(rel_keys))) as pool:
+        return {key: sig for key, sig in pool.map(head, rel_keys) if sig}
+
 # -------- AWS INSTANCES
 
-# Single place to classify a stack given its instance states
-def classify_stack(states: List[str]) -> str:
-    if not states:
-        return "Unknown"
-    all_running = all(s == "running" for s in states)
-    all_stopped = all(s == "stopped" for s in states)
-    opening = (any(s == "pending" for s in states) or any(s == "running" for s in states)) and any(s == "stopped" for s in states)
-    closing = any(s == "stopping" for s in states)
-    if all_running:
-        return "Running"
-    if all_stopped:
-        return "Off"
-    if opening and not closing:
-        return "Opening"
-    if closing and not opening:
-        return "Closing"
-    return "Degraded"
-
-
-REQUIRED_ROLES = {
-    "INFORBCLM01LInstance",
-    "INFORBCVP01Instance",
-    "INFORBCDB01Instance",
-    "INFORBCAD01Instance",
-}
+STACK_TAG = "aws:cloudformation:stack-name"
+
+# Only these tags are read per instance; everything else is skipped without building a dict
+_STACK_TAG_KEYS = frozenset({
+    STACK_TAG,
+    "aws:cloudformation:logical-id",
+    "customerPrefix",
+    "Environment", "ENV", "Env",
+    "ITOPS_Region",
+})
+
+def _stack_tags(inst: Dict[str, Any]) -> Dict[str, str]:
+    return {t["Key"]: t["Value"] for t in inst.get("Tags", ()) if t["Key"] in _STACK_TAG_KEYS}
 
-def _collect_stack_info(*, region: str = "us-east-1") -> Dict[str, Dict[str, Any]]:
-    ec2 = boto3.client("ec2", region_name=region)
+def _stack_instance_filters(states: List[str] | None = None) -> List[Dict[str, Any]]:
+    """EC2-side filters: CloudFormation stack members only, optionally in the given states."""
+    filters: List[Dict[str, Any]] = [{"Name": "tag-key", "Values": [STACK_TAG]}]
+    if states:
+        filters.append({"Name": "instance-state-name", "Values": list(states)})
+    return filters
+
+def _collect_stack_info(*, region: str = "us-east-1", states: List[str] | None = None) -> Dict[str, Stack]:
+    """
+    Group CloudFormation-managed instances by stack.
+    states: optional instance-state-name filter (e.g. ["running"]), applied by EC2.
+    """
+    ec2 = get_client("ec2", region)
     paginator = ec2.get_paginator("describe_instances")
 
-    stacks: Dict[str, Dict[str, Any]] = defaultdict(
-        lambda: {
-            "states": [],
-            "client": None,
-            "alwayson": "Off",
-            "instance_ids": [],
-            "running_ids": [],
-            "lm_candidate_id": None,
-            "env": None,
-            "region": region,
-            # NEW: per-logical-id instance id and state
-            "roles": {},             # {"INFORBCLM01LInstance": {"id": "...", "state": "running"}}
-        }
-    )
+    stacks: Dict[str, Stack] = {}
 
-    for page in paginator.paginate():
+    pages = paginator.paginate(
+        Filters=_stack_instance_filters(states),
+        PaginationConfig={"PageSize": 1000},   # API max; fewer round trips on big accounts
+    )
+    for page in pages:
         for res in page.get("Reservations", []):
             for inst in res.get("Instances", []):
-                tags = {t["Key"]: t["Value"] for t in inst.get("Tags", [])}
-                stack = tags.get("aws:cloudformation:stack-name")
-                if not stack:
+                tags = _stack_tags(inst)
+                name = tags.get(STACK_TAG)
+                iid = inst.get("InstanceId")
+                if not name or not iid:
                     continue
 
                 state = (inst.get("State") or {}).get("Name", "")
-                iid = inst.get("InstanceId")
                 logical_id = tags.get("aws:cloudformation:logical-id", "")
 
-                info = stacks[stack]
-                info["states"].append(state)
-                if iid:
-                    info["instance_ids"].append(iid)
-                    if state == "running":
-                        info["running_ids"].append(iid)
-
+                stack = stacks.get(name)
+                if stack is None:
+                    stack = stacks[name] = Stack(name=name, region=region)
+                stack.instances[iid] = state
                 if logical_id:
-                    info["roles"][logical_id] = {"id": iid, "state": state}
+                    stack.roles[logical_id] = RoleInstance(iid, state)
 
                 client = tags.get("customerPrefix")
                 if client:
-                    info["client"] = client
+                    stack.client = client
 
                 env = tags.get("Environment") or tags.get("ENV") or tags.get("Env")
                 if env:
-                    info["env"] = env
+                    stack.env = env
 
-                if logical_id == "INFORBCLM01LInstance":
-                    info["lm_candidate_id"] = iid
+                if logical_id == LANDMARK_ROLE:
                     itops_region = (tags.get("ITOPS_Region") or "").strip().upper()
-                    info["alwayson"] = "On" if itops_region == "ALWAYSON" else "Off"
+                    stack.alwayson = "On" if itops_region == "ALWAYSON" else "Off"
 
+    for stack in stacks.values():
+        stack.classify()
     return stacks
 
-def is_stack_fully_running(info: Dict[str, Any]) -> bool:
-    roles = info.get("roles", {})
-    for rid in REQUIRED_ROLES:
-        r = roles.get(rid)
-        if not r or r.get("state") != "running":
-            return False
-    return True
-
-def get_running_landmark_targets(*, region: str = "us-east-1") -> List[Dict[str, Any]]:
-    stacks = _collect_stack_info(region=region)
-    targets: List[Dict[str, Any]] = []
-    for name, info in stacks.items():
-        if not is_stack_fully_running(info):
-            continue
-        # Use the Landmark app instance as the target
-        lm = info["roles"].get("INFORBCLM01LInstance")
-        if not lm or not lm.get("id"):
-            continue
-        targets.append({
-            "id": lm["id"],
-            "name": name,
-            "env": info.get("env") or "",
-            "region": info.get("region"),
-        })
-    targets.sort(key=lambda x: x["name"])
-    return targets
+INSTANCE_STATUS_BATCH = 100   # describe_instance_status accepts at most 100 InstanceIds
 
+def collect_instance_states(*, region: str, instance_ids: List[str]) -> Dict[str, str]:
+    """
+    State-only poll: {instance_id: state} via describe_instance_status.
+    IncludeAllInstances returns stopped/pending instances too (not only running).
+    Raises ClientError InvalidInstanceID.NotFound once an id has aged out of EC2.
+    """
+    ec2 = get_client("ec2", region)
+    out: Dict[str, str] = {}
+    for i in range(0, len(instance_ids), INSTANCE_STATUS_BATCH):
+        resp = ec2.describe_instance_status(
+            InstanceIds=instance_ids[i:i + INSTANCE_STATUS_BATCH],
+            IncludeAllInstances=True,
+        )
+        for st in resp.get("InstanceStatuses", []):
+            out[st["InstanceId"]] = (st.get("InstanceState") or {}).get("Name", "")
+    return out
 
-def get_stacks_summary(*, region: str = "us-east-1") -> List[Dict[str, Any]]:
+def apply_instance_states(stacks: Dict[str, Stack], states: Dict[str, str]) -> tuple[Dict[str, Stack], List[str]]:
+    """
+    Patch fresh instance states into a stack map; only stacks with a changed
+    instance are copied and reclassified. Returns (new map, changed stack names).
+    The input map is not modified (readers may hold it).
+    """
+    out = dict(stacks)
+    changed: List[str] = []
+    for name, stack in stacks.items():
+        new = stack.with_states(states)
+        if new is not None:
+            out[name] = new
+            changed.append(name)
+    return out, changed
+
+def _per_region(regions: List[str], fn) -> Dict[str, Dict[str, Any]]:
+    """Run fn(region) -> stacks for every region concurrently; errors are reported, not raised."""
+    def _one(region: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            stacks, error = fn(region), None
+        except Exception as e:
+            stacks, error = None, str(e)
+        return {"stacks": stacks, "duration_ms": round((time.perf_counter() - start) * 1000, 2), "error": error}
+
+    if len(regions) == 1:
+        return {regions[0]: _one(regions[0])}
+    with ThreadPoolExecutor(max_workers=len(regions)) as pool:
+        return dict(zip(regions, pool.map(_one, regions)))
+
+def stack_regions() -> List[str]:
+    """Regions whose stacks are shown (AWS_STACK_REGIONS), in configured order."""
+    return list(current_app.config.get("AWS_STACK_REGIONS") or ["us-east-1"])
+
+def collect_stacks_by_region(regions: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Run _collect_stack_info for every region concurrently.
+    Page latency is the slowest region, not the sum. A failing region is
+    reported, not raised, so one bad region doesn't blank the others:
+      {"us-east-1": {"stacks": {...}, "duration_ms": 812.4, "error": None}, ...}
+    """
+    return _per_region(regions, lambda region: _collect_stack_info(region=region))
+
+def refresh_states_by_region(topology: Dict[str, Dict[str, Stack]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Cheap tier: re-poll only instance states for the known stacks of each region.
+    A region whose instance set changed (an id no longer exists) is re-collected in full.
+    Result shape matches collect_stacks_by_region, plus "changed" stack names.
+    """
+    changed: Dict[str, List[str]] = {}
+
+    def _states(region: str) -> Dict[str, Dict[str, Any]]:
+        stacks = topology[region]
+        ids = [iid for stack in stacks.values() for iid in stack.instances]
+        try:
+            states = collect_instance_states(region=region, instance_ids=ids)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "InvalidInstanceID.NotFound":
+                raise
+            fresh = _collect_stack_info(region=region)
+            changed[region] = list(fresh)
+            return fresh
+        new, changed[region] = apply_instance_states(stacks, states)
+        return new
+
+    results = _per_region(list(topology), _states)
+    for region, r in results.items():
+        r["changed"] = changed.get(region, [])
+    return results
+
+def merge_region_stacks(by_region: Dict[str, Dict[str, Stack]]) -> Dict[str, Stack]:
+    """
+    {region: {name: Stack}} -> {name: Stack}. Every Stack keeps its own region.
+    Stack names are only unique per region; on a clash the earlier region wins.
+    """
+    merged: Dict[str, Stack] = {}
+    for region, stacks in by_region.items():
+        for name, stack in stacks.items():
+            if name in merged:
+                current_app.app_log.warning(
+                    "stack_name_clash", extra={"stack": name, "kept": merged[name].region, "dropped": region}
+                )
+                continue
+            merged[name] = stack
+    return merged
+
+def collect_stacks(regions: List[str] | None = None) -> Dict[str, Stack]:
+    """Live, merged stack view across regions (default: AWS_STACK_REGIONS)."""
+    by_region = collect_stacks_by_region(regions or stack_regions())
+    for region, r in by_region.items():
+        if r["error"]:
+            current_app.logger.error("stack_collect_failed: region=%s error=%s", region, r["error"])
+    return merge_region_stacks({reg: r["stacks"] for reg, r in by_region.items() if r["stacks"] is not None})
+
+# -------- Stack-name index (stack -> role -> instance id), shared via cache
+
+STACK_INDEX_KEY = "stack_index:v1"
+
+def build_stack_index(stacks: Dict[str, Stack]) -> Dict[str, Dict[str, Any]]:
+    """{name: Stack} -> {name: {"region": "us-east-1", "roles": {"INFORBCDB01Instance": "i-...", ...}}}"""
+    return {
+        name: {"region": stack.region, "roles": {lid: r.instance_id for lid, r in stack.roles.items()}}
+        for name, stack in stacks.items()
+    }
+
+def store_stack_index(index: Dict[str, Dict[str, Any]]) -> None:
+    # Outlives a couple of topology refreshes so a slow refresh never leaves a gap
+    ttl = 2 * int(current_app.config.get("STACK_TOPOLOGY_REFRESH_SECONDS", 900))
+    cache.set(STACK_INDEX_KEY, index, timeout=ttl)
+
+def _lookup_stack_instance_live(stack_name: str, logical_id: str, regions: List[str]) -> tuple[str | None, str | None]:
+    for region in regions:
+        ec2 = get_client("ec2", region)
+        resp = ec2.describe_instances(Filters=[
+            {"Name": f"tag:{STACK_TAG}", "Values": [stack_name]},
+            {"Name": "tag:aws:cloudformation:logical-id", "Values": [logical_id]},
+        ])
+        for res in resp.get("Reservations", []):
+            for inst in res.get("Instances", []):
+                if inst.get("InstanceId"):
+                    return inst["InstanceId"], region
+    return None, None
+
+def resolve_stack_instance(stack_name: str, logical_id: str) -> tuple[str | None, str | None]:
+    """
+    (instance_id, region) for one role of a stack, from the cached index.
+    Only a miss costs an EC2 call; its answer is written back into the index.
+    """
+    index = cache.get(STACK_INDEX_KEY) or {}
+    entry = index.get(stack_name)
+    if entry and entry["roles"].get(logical_id):
+        return entry["roles"][logical_id], entry["region"]
+
+    regions = [entry["region"]] if entry else stack_regions()
+    iid, region = _lookup_stack_instance_live(stack_name, logical_id, regions)
+    current_app.app_log.info(
+        "stack_index_miss", extra={"stack": stack_name, "role": logical_id, "found": bool(iid)}
+    )
+    if iid:
+        entry = index.setdefault(stack_name, {"region": region, "roles": {}})
+        entry["roles"][logical_id] = iid
+        store_stack_index(index)
+    return iid, region
+
+# -------- Stack power (start/stop)
+
+POWER_TARGET_STATES = {
+    # action -> instance states that the action applies to
+    "start": {"stopped"},
+    "stop": {"pending", "running"},
+}
+
+def _power_region(action: str, region: str, ids: List[str], batch: int) -> Dict[str, Any]:
+    ec2 = get_client("ec2", region)
+    call = ec2.start_instances if action == "start" else ec2.stop_instances
+    key = "StartingInstances" if action == "start" else "StoppingInstances"
+    states: Dict[str, str] = {}
+    errors: List[Dict[str, Any]] = []
+    for i in range(0, len(ids), batch):
+        chunk = ids[i:i + batch]
+        try:
+            resp = call(InstanceIds=chunk)
+        except ClientError as e:
+            errors.append({"region": region, "ids": chunk, "error": e.response["Error"].get("Message", str(e))})
+            continue
+        for item in resp.get(key, []):
+            states[item["InstanceId"]] = (item.get("CurrentState") or {}).get("Name", "")
+    return {"states": states, "errors": errors}
+
+def stack_power(action: str, stacks: List[Stack], *, honor_alwayson: bool = True) -> Dict[str, Any]:
+    """
+    Start or stop every instance of the given stacks.
+    Instance ids from all stacks are batched per region (STACK_POWER_BATCH ids
+    per call) and regions run concurrently. With honor_alwayson, "stop" skips
+    stacks flagged ALWAYSON.
+      {"instances": {stack: [ids]}, "skipped": [{"stack", "reason"}], "states": {iid: state}, "errors": [...]}
+    """
+    if action not in POWER_TARGET_STATES:
+        raise ValueError(f"unknown action: {action}")
+    batch = int(current_app.config.get("STACK_POWER_BATCH", 100))
+    wanted = POWER_TARGET_STATES[action]
+
+    by_region: Dict[str, List[str]] = defaultdict(list)
+    instances: Dict[str, List[str]] = {}
+    skipped: List[Dict[str, str]] = []
+    for stack in stacks:
+        if action == "stop" and honor_alwayson and stack.alwayson == "On":
+            skipped.append({"stack": stack.name, "reason": "alwayson"})
+            continue
+        ids = [iid for iid, st in stack.instances.items() if st in wanted]
+        if not ids:
+            skipped.append({"stack": stack.name, "reason": f"nothing to {action}"})
+            continue
+        instances[stack.name] = ids
+        by_region[stack.region].extend(ids)
+
+    states: Dict[str, str] = {}
+    errors: List[Dict[str, Any]] = []
+    if by_region:
+        with ThreadPoolExecutor(max_workers=len(by_region)) as pool:
+            futures = [pool.submit(_power_region, action, reg, ids, batch) for reg, ids in by_region.items()]
+            for fut in as_completed(futures):
+                r = fut.result()
+                states.update(r["states"])
+                errors.extend(r["errors"])
+    return {"instances": instances, "skipped": skipped, "states": states, "errors": errors}
+
+def is_stack_fully_running(stack: Stack) -> bool:
+    return stack.fully_running
+
+def get_running_landmark_targets(*, regions: List[str] | None = None, stacks: Dict[str, Stack] | None = None) -> List[Dict[str, Any]]:
+    """stacks: a prefetched stack map; collected live across regions if None. Prefer StackView.targets."""
+    if stacks is None:
+        stacks = collect_stacks(regions)
+    return StackView.build(stacks).targets
+
+
+def get_stacks_summary(*, regions: List[str] | None = None, stacks: Dict[str, Stack] | None = None) -> List[Dict[str, Any]]:
     """
     Return a list of stacks for the Instances page, with computed state.
     Shape matches what your template already expects.
+    stacks: a prefetched stack map; collected live across regions if None. Prefer StackView.summary.
     """
-    stacks = _collect_stack_info(region=region)
-    out: List[Dict[str, Any]] = []
-    for name, info in sorted(stacks.items()):
-        out.append(
-            {
-                "name": name,
-                "client": info.get("client") or "-",
-                "state": classify_stack(info.get("states", [])),
-                "alwayson": info.get("alwayson", "Off"),
-            }
-        )
-    return out
+    if stacks is None:
+        stacks = collect_stacks(regions)
+    return StackView.build(stacks).summary
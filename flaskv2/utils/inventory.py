@@ -0,0 +1,224 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+
+from flaskv2.extensions import cache
+from flaskv2.utils.background import PeriodicTask
+from flaskv2.utils.helpers import apply_instance_states, build_stack_index, collect_stacks_by_region, merge_region_stacks, refresh_states_by_region, stack_regions, store_stack_index
+from flaskv2.utils.stack_model import Stack, StackView
+
+SNAPSHOT_KEY = "stack_view:v1"
+
+
+class StackInventory:
+    """
+    In-process snapshot of every stack across AWS_STACK_REGIONS.
+    Pages read from memory; a background PeriodicTask refreshes it in two tiers:
+      - topology (full describe_instances: stacks, roles, instance ids) every
+        STACK_TOPOLOGY_REFRESH_SECONDS
+      - states only (describe_instance_status) every STACK_INVENTORY_REFRESH_SECONDS,
+        reclassifying just the stacks whose instances changed
+    Regions refresh in parallel. The first read collects synchronously (one
+    caller does the work, the others wait for it) unless a recent compact
+    snapshot is in the cache, e.g. after a restart. A region that fails to
+    refresh keeps its last good stacks.
+
+    Each refresh that changes a stack's summary row bumps `version` and wakes
+    changes_since() waiters (the Stacks page long-poll), so one poller serves
+    any number of viewers. While a page has polled in the last
+    STACK_LIVE_IDLE_SECONDS, states are polled every STACK_LIVE_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._by_region: Dict[str, Dict[str, Stack]] = {}             # region -> stack name -> Stack
+        self._view: StackView | None = None                            # merged view + aggregates
+        self._updated: float = 0.0                                     # epoch seconds
+        self._timings: Dict[str, Dict[str, Any]] = {}                  # region -> {duration_ms, error}
+        self._topology_at: float = 0.0                                 # last full collection
+        self._index: Dict[str, Dict[str, Any]] | None = None           # last stack index written to cache
+        self._task: PeriodicTask | None = None
+        # change feed
+        self._cond = threading.Condition()
+        self._version = 0
+        self._changes: deque = deque(maxlen=100)   # (version, {"changed": [...], "removed": [...]})
+        self._watched_at = 0.0
+
+    def refresh(self, *, full: bool = False) -> None:
+        with self._refresh_lock:
+            self._refresh_locked(full=full)
+        self._set_pace()
+
+    def _refresh_locked(self, *, full: bool = False) -> None:
+        start = time.perf_counter()
+        regions = stack_regions()
+        topology_ttl = int(current_app.config.get("STACK_TOPOLOGY_REFRESH_SECONDS", 900))
+        full = (
+            full
+            or time.time() - self._topology_at >= topology_ttl
+            or any(reg not in self._by_region for reg in regions)
+        )
+        if full:
+            results = collect_stacks_by_region(regions)
+            if all(r["stacks"] is not None for r in results.values()):
+                self._topology_at = time.time()
+        else:
+            results = refresh_states_by_region({reg: self._by_region[reg] for reg in regions})
+
+        by_region = dict(self._by_region)
+        for region, r in results.items():
+            if r["stacks"] is not None:
+                by_region[region] = r["stacks"]
+            else:
+                current_app.logger.error("stack_inventory_region_failed: region=%s error=%s", region, r["error"])
+        merged = merge_region_stacks({reg: by_region[reg] for reg in results if reg in by_region})
+        timings = {reg: {"duration_ms": r["duration_ms"], "error": r["error"]} for reg, r in results.items()}
+
+        view = StackView.build(merged)
+        with self._lock:
+            previous = self._view
+            self._by_region = by_region
+            self._view = view
+            self._updated = time.time()
+            self._timings = timings
+        self._publish(previous, view)
+        ttl = int(current_app.config.get("STACK_TOPOLOGY_REFRESH_SECONDS", 900))
+        cache.set(SNAPSHOT_KEY, {"rows": view.dump(), "updated": self._updated, "topology_at": self._topology_at}, timeout=ttl)
+
+        # Per-stack endpoints resolve instance ids from this index (state-only refreshes rarely change it)
+        index = build_stack_index(merged)
+        if full or index != self._index:
+            store_stack_index(index)
+            self._index = index
+        current_app.app_log.info(
+            "stack_inventory_refreshed",
+            extra={
+                "tier": "topology" if full else "states",
+                "stacks": len(merged),
+                "changed": None if full else sum(len(r["changed"]) for r in results.values()),
+                "regions": timings,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            },
+        )
+
+    def apply_states(self, states: Dict[str, str]) -> None:
+        """
+        Patch known instance states (e.g. the CurrentState returned by start/stop)
+        into the snapshot right away, then poll sooner to follow the transition.
+        """
+        if not states or self._view is None:
+            return
+        with self._refresh_lock:
+            by_region = {reg: apply_instance_states(stacks, states)[0] for reg, stacks in self._by_region.items()}
+            view = StackView.build(merge_region_stacks(by_region))
+            with self._lock:
+                previous = self._view
+                self._by_region = by_region
+                self._view = view
+                self._updated = time.time()
+            self._publish(previous, view)
+        if self._task is not None:
+            self._task.trigger()
+
+    # ---------- change feed ----------
+
+    def _publish(self, old: StackView | None, new: StackView) -> None:
+        if old is None:
+            return
+        changed = [
+            row for row in new.summary
+            if (prev := old.stacks.get(row["name"])) is not new.stacks[row["name"]]
+            and (prev is None or prev.summary() != row)
+        ]
+        removed = [name for name in old.stacks if name not in new.stacks]
+        if not changed and not removed:
+            return
+        with self._cond:
+            self._version += 1
+            self._changes.append((self._version, {"changed": changed, "removed": removed}))
+            self._cond.notify_all()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def changes_since(self, since: int, timeout: float) -> Tuple[int, Optional[List[Dict[str, Any]]]]:
+        """
+        Block up to `timeout` for changes newer than `since`.
+        Returns (version, diffs); diffs is [] on timeout and None when `since`
+        is too old for the feed or newer than the current version (e.g. after
+        a restart); the caller should then resend the full table.
+        """
+        with self._cond:
+            if since > self._version:
+                return self._version, None
+            if self._version == since:
+                self._cond.wait(timeout)
+            if self._version == since:
+                return since, []
+            if not self._changes or self._changes[0][0] > since + 1:
+                return self._version, None
+            return self._version, [c for v, c in self._changes if v > since]
+
+    def watch(self) -> None:
+        """A live page just polled; keep states on the fast interval for a while."""
+        self._watched_at = time.time()
+        self._set_pace()
+
+    def _set_pace(self) -> None:
+        if self._task is None:
+            return
+        cfg = current_app.config
+        fast = time.time() - self._watched_at < int(cfg.get("STACK_LIVE_IDLE_SECONDS", 30))
+        interval = cfg.get("STACK_LIVE_REFRESH_SECONDS", 5) if fast else cfg.get("STACK_INVENTORY_REFRESH_SECONDS", 30)
+        if self._task.interval != float(interval):
+            self._task.interval = float(interval)
+            if fast:
+                self._task.trigger()
+
+    def _ensure_started(self) -> None:
+        if self._task is None or not self._task.running:
+            interval = int(current_app.config.get("STACK_INVENTORY_REFRESH_SECONDS", 30))
+            if self._task is None:
+                self._task = PeriodicTask("stack-inventory", self.refresh, interval)
+            self._task.start(current_app._get_current_object())
+
+    def _load_cached(self) -> bool:
+        """Warm start from the compact snapshot; the worker then refreshes states right away."""
+        snap = cache.get(SNAPSHOT_KEY)
+        if not snap:
+            return False
+        view = StackView.load(snap["rows"])
+        by_region: Dict[str, Dict[str, Stack]] = {}
+        for name, stack in view.stacks.items():
+            by_region.setdefault(stack.region, {})[name] = stack
+        with self._lock:
+            self._by_region = by_region
+            self._view = view
+            self._updated = snap["updated"]
+            self._topology_at = snap["topology_at"]
+        self._task.trigger()
+        return True
+
+    def get(self) -> Tuple[StackView, float]:
+        """Return (view, age_seconds) for the merged multi-region snapshot."""
+        self._ensure_started()
+        if self._view is None:
+            with self._refresh_lock:
+                # Another request may have filled it while we waited for the lock
+                if self._view is None and not self._load_cached():
+                    self._refresh_locked()
+        with self._lock:
+            return self._view, time.time() - self._updated
+
+    def timings(self) -> Dict[str, Dict[str, Any]]:
+        """Per-region duration/error of the last refresh."""
+        with self._lock:
+            return dict(self._timings)
+
+
+stack_inventory = StackInventory()
@@ -18,6 +18,10 @@ side_nav_items = {
                     "text": "Stacks View",
                     "route": "main.instances",
                 },
+                {
+                    "text": "Storage Report",
+                    "route": "main.storage_report",
+                },
             ]
         },
     },
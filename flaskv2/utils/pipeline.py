@@ -0,0 +1,255 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+
+from flaskv2.utils.contants import TMP_BUILDS_CLEAR_LIST, TMP_BUILDS_FILTER_REGEX, TMP_DIR
+from flaskv2.utils.helpers import _sanitize_suffix, lars_source_checks, plan_artifacts, prune_finished_jobs, upload_item
+from flaskv2.utils.ssm import send_inject_command
+from flaskv2.utils.ssm_tracker import command_tracker
+
+# In-process registry of pipeline jobs (same pattern as the S3 prefix purge)
+_pipeline_jobs: Dict[str, Dict[str, Any]] = {}
+_pipeline_lock = threading.Lock()
+
+
+def _ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 2)
+
+
+def get_pipeline(job_id: str) -> Optional[Dict[str, Any]]:
+    with _pipeline_lock:
+        job = _pipeline_jobs.get(job_id)
+        if not job:
+            return None
+        return {**job, "artifacts": [dict(a) for a in job["artifacts"]], "stages": dict(job["stages"])}
+
+
+def _update(job_id: str, **fields) -> None:
+    with _pipeline_lock:
+        _pipeline_jobs[job_id].update(fields)
+
+
+def _update_artifact(job_id: str, idx: int, **fields) -> None:
+    with _pipeline_lock:
+        _pipeline_jobs[job_id]["artifacts"][idx].update(fields)
+
+
+def _by_region(targets: List[Dict[str, str]]) -> Dict[str, List[str]]:
+    out: Dict[str, List[str]] = {}
+    for t in targets:
+        out.setdefault(t["region"], []).append(t["id"])
+    return out
+
+
+def _send(regions: Dict[str, List[str]], **inject_kwargs) -> List[Tuple[str, str, List[str]]]:
+    """One inject command per region; returns [(command_id, region, instance_ids)], all tracked."""
+    sent = []
+    for region, ids in regions.items():
+        cid = send_inject_command(instance_ids=ids, region=region, dest=TMP_DIR, filtered_listing=True,
+                                  list_filter_regex=TMP_BUILDS_FILTER_REGEX, **inject_kwargs)
+        command_tracker.track(cid, region, ids)
+        sent.append((cid, region, ids))
+    return sent
+
+
+def _wait(commands: List[Tuple[str, str, List[str]]], deadline: float) -> str:
+    """Block until every command is terminal (or the deadline); returns the combined status."""
+    statuses = []
+    for cid, _, _ in commands:
+        snap = command_tracker.snapshot(cid)
+        while snap and not snap["done"] and time.time() < deadline:
+            snap = command_tracker.wait(cid, snap["version"], timeout=min(20, max(deadline - time.time(), 0)))
+        statuses.append(snap["status"] if snap and snap["done"] else "TimedOut")
+    return "Success" if all(s == "Success" for s in statuses) else next(s for s in statuses if s != "Success")
+
+
+def _run_direct(app, job_id: str, plan: List[Dict[str, Any]], regions: Dict[str, List[str]],
+                preclear: bool, deadline: float) -> None:
+    """Direct path: the stacks download every artifact from LARS themselves, in one command per region."""
+    t = time.perf_counter()
+    checks = lars_source_checks(plan)
+    with _pipeline_lock:
+        _pipeline_jobs[job_id]["stages"]["checks_ms"] = _ms(t)
+    names = [it["key"].rsplit("/", 1)[-1] for it in plan]
+    for idx, name in enumerate(names):
+        # only a sha256 proves the bytes are LARS's; a size alone (or nothing) is reported as unverified
+        size, sha = checks.get(name) or (None, None)
+        verified = "sha256" if sha else ("size only" if size is not None else "unverified")
+        _update_artifact(job_id, idx, upload="n/a", inject="running", verified=verified)
+
+    t = time.perf_counter()
+    commands = _send(
+        regions, bucket="", root="", key_prefix="", files=names,
+        preclear_names=TMP_BUILDS_CLEAR_LIST if preclear else [],
+        parallel=max(2, int(app.config.get("INJECT_PARALLEL", 4))),
+        source_urls={name: it["source_url"] for name, it in zip(names, plan)},
+        source_checks=checks,
+    )
+    for idx in range(len(plan)):
+        _update_artifact(job_id, idx, commands=[{"command_id": c, "region": r} for c, r, _ in commands])
+    status = _wait(commands, deadline)
+    inject_ms = _ms(t)
+    for idx in range(len(plan)):
+        _update_artifact(job_id, idx, inject=status, inject_ms=inject_ms)
+    with _pipeline_lock:
+        _pipeline_jobs[job_id]["stages"]["direct_ms"] = inject_ms
+
+
+def _run_pipeline(app, job_id: str, selections: List[Dict[str, str]], suffix: str,
+                  targets: List[Dict[str, str]], preclear: bool, path: str) -> None:
+    with app.app_context():
+        cfg = app.config
+        start = time.perf_counter()
+        deadline = time.time() + int(cfg.get("PIPELINE_TIMEOUT_SECONDS", 1800))
+        regions = _by_region(targets)
+
+        # 1) plan
+        t = time.perf_counter()
+        plan = [it for sel in selections
+                for it in plan_artifacts(sel["app"], sel["stream"], sel["build"], suffix_prefix=suffix)]
+        with _pipeline_lock:
+            job = _pipeline_jobs[job_id]
+            job["stages"]["plan_ms"] = _ms(t)
+            job["artifacts"] = [
+                {"name": it["key"].rsplit("/", 1)[-1], "key": it["key"], "source_url": it["source_url"],
+                 "upload": "queued", "upload_ms": None, "inject": "waiting", "inject_ms": None,
+                 "verified": None, "commands": [], "error": None}
+                for it in plan
+            ]
+            job["state"] = "running"
+
+        if path == "direct":
+            _run_direct(app, job_id, plan, regions, preclear, deadline)
+            _finish(app, job_id, start, upload_ok="n/a")
+            return
+
+        # 2) uploads start right away; the preclear runs on the stacks meanwhile
+        workers = max(1, int(cfg.get("PIPELINE_UPLOAD_WORKERS", 3)))
+        uploads_start = time.perf_counter()
+
+        def upload(idx: int, item: Dict[str, Any]):
+            with app.app_context():
+                _update_artifact(job_id, idx, upload="uploading")
+                t0 = time.perf_counter()
+                result = upload_item(item)
+                return idx, result, _ms(t0)
+
+        with ThreadPoolExecutor(max_workers=workers) as uploads, ThreadPoolExecutor(max_workers=max(1, len(plan))) as watchers:
+            futures = [uploads.submit(upload, i, it) for i, it in enumerate(plan)]
+
+            if preclear:
+                t = time.perf_counter()
+                status = _wait(_send(regions, bucket=plan[0]["bucket"] if plan else "migops", root="LARS/", key_prefix="",
+                                     files=[], preclear_names=TMP_BUILDS_CLEAR_LIST), deadline)
+                with _pipeline_lock:
+                    _pipeline_jobs[job_id]["stages"]["preclear_ms"] = _ms(t)
+                if status != "Success":
+                    _update(job_id, errors=[f"preclear {status}"])
+
+            def watch(idx: int, commands, sent_at: float):
+                with app.app_context():
+                    status = _wait(commands, deadline)
+                    _update_artifact(job_id, idx, inject=status, inject_ms=_ms(sent_at))
+                    return status
+
+            # 3) each artifact is injected as soon as its upload lands
+            watches = []
+            for fut in as_completed(futures):
+                idx, result, upload_ms = fut.result()
+                item = plan[idx]
+                if not result.get("ok"):
+                    _update_artifact(job_id, idx, upload="failed", upload_ms=upload_ms, inject="skipped", error=result.get("error"))
+                    continue
+                _update_artifact(job_id, idx, upload="done", upload_ms=upload_ms, inject="running")
+                directory, name = item["key"].rsplit("/", 1)
+                sent_at = time.perf_counter()
+                try:
+                    commands = _send(regions, bucket=item["bucket"], root=f"{directory}/", key_prefix="",
+                                     files=[name], preclear_names=[])
+                except Exception as e:
+                    app.logger.exception("pipeline_inject_send_failed: %s", item["key"])
+                    _update_artifact(job_id, idx, inject="SendFailed", error=str(e))
+                    continue
+                _update_artifact(job_id, idx, commands=[{"command_id": c, "region": r} for c, r, _ in commands])
+                watches.append(watchers.submit(watch, idx, commands, sent_at))
+
+            with _pipeline_lock:
+                _pipeline_jobs[job_id]["stages"]["uploads_ms"] = _ms(uploads_start)
+            for w in watches:
+                w.result()
+
+        _finish(app, job_id, start, upload_ok="done")
+
+
+def _finish(app, job_id: str, start: float, *, upload_ok: str) -> None:
+    with _pipeline_lock:
+        job = _pipeline_jobs[job_id]
+        job["stages"]["total_ms"] = _ms(start)
+        ok = all(a["upload"] == upload_ok and a["inject"] == "Success" for a in job["artifacts"]) and not job["errors"]
+        job["state"] = "done" if ok else "failed"
+        # direct path: a successful download without a sha256 is not the same as a verified one
+        job["unverified"] = [a["name"] for a in job["artifacts"] if a.get("verified") not in (None, "sha256")]
+        job["finished_at"] = time.time()
+        summary = {"artifacts": len(job["artifacts"]), "path": job["path"], "stages": dict(job["stages"]), "state": job["state"],
+                   "unverified": len(job["unverified"])}
+
+    app.audit.info("lars2aws.pipeline.finished", extra={"job_id": job_id, **summary})
+
+
+def start_pipeline(*, selections: List[Dict[str, str]], suffix: str, targets: List[Dict[str, str]],
+                   preclear: bool = True, path: str = "s3", actor: Optional[str] = None) -> str:
+    """
+    LARS -> S3 -> stacks in one background job. Uploads run concurrently
+    (PIPELINE_UPLOAD_WORKERS) while the stacks are pre-cleared; each artifact
+    is injected into every target as soon as its own upload finishes, so the
+    total is roughly the slowest single upload + inject rather than the sum.
+
+    path="direct" skips S3: each stack downloads the artifacts from LARS
+    itself (parallel curl, size/sha256 checked), for one-off test injections.
+    Artifacts LARS publishes no sha256 for are listed in the job's
+    "unverified" and flagged per artifact instead of passing as plain success.
+    The job records the path used and its timings. Poll get_pipeline(job_id)
+    for per-artifact state and stage timings.
+    """
+    if not selections:
+        raise ValueError("no builds selected")
+    if not targets:
+        raise ValueError("no target stacks")
+    if path not in ("s3", "direct"):
+        raise ValueError("path must be 's3' or 'direct'")
+
+    job_id = uuid.uuid4().hex
+    with _pipeline_lock:
+        prune_finished_jobs(_pipeline_jobs)
+        _pipeline_jobs[job_id] = {
+            "state": "planning",
+            "path": path,
+            "actor": actor,
+            "s3_prefix": _sanitize_suffix(suffix),
+            "selections": selections,
+            "targets": targets,
+            "artifacts": [],
+            "stages": {"plan_ms": None, "preclear_ms": None, "uploads_ms": None, "total_ms": None},
+            "errors": [],
+            "unverified": [],
+            "started_at": time.time(),
+            "finished_at": None,
+        }
+
+    app = current_app._get_current_object()
+
+    def _target():
+        try:
+            _run_pipeline(app, job_id, selections, suffix, targets, preclear, path)
+        except Exception as e:
+            app.logger.exception("pipeline_failed: %s", job_id)
+            with _pipeline_lock:
+                _pipeline_jobs[job_id].update(state="failed", finished_at=time.time())
+                _pipeline_jobs[job_id]["errors"].append(str(e))
+
+    threading.Thread(target=_target, name=f"lars-pipeline-{job_id[:8]}", daemon=True).start()
+    return job_id
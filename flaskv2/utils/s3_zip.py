@@ -0,0 +1,204 @@
+import re
+import struct
+import zlib
+from typing import Any, Dict, List, Optional
+
+from flask import current_app
+
+from flaskv2.extensions import cache
+
+# ZIP record signatures / fixed sizes (APPNOTE.TXT)
+_EOCD_SIG           = b"PK\x05\x06"
+_ZIP64_LOCATOR_SIG  = b"PK\x06\x07"
+_ZIP64_EOCD_SIG     = b"PK\x06\x06"
+_CDIR_SIG           = b"PK\x01\x02"
+_LOCAL_SIG          = b"PK\x03\x04"
+
+_EOCD_LEN           = 22
+_ZIP64_LOCATOR_LEN  = 20
+_ZIP64_EOCD_LEN     = 56
+_CDIR_LEN           = 46
+_LOCAL_LEN          = 30
+
+# EOCD + the longest possible archive comment; usually also covers the central directory
+_TAIL_BYTES         = _EOCD_LEN + 0xFFFF
+_MAX_ENTRY_BYTES    = 1024 * 1024   # pom.properties / MANIFEST.MF are tiny; refuse anything big
+
+# Known version entries per artifact (others: single pom.properties, then MANIFEST.MF)
+JAR_VERSION_ENTRIES = {
+    "grid-installer.jar": "META-INF/maven/grid.runtime/installer-code/pom.properties",
+}
+
+_MANIFEST_KEYS = ("Implementation-Version", "Bundle-Version", "Specification-Version")
+
+
+class ZipReadError(Exception):
+    """Archive could not be parsed from ranged reads."""
+
+
+def _range_get(s3, bucket: str, key: str, start: int, end: int, etag: str | None = None) -> bytes:
+    """GET bytes [start, end] (inclusive). IfMatch pins the read to the ETag we cache under."""
+    params: Dict[str, Any] = {"Bucket": bucket, "Key": key, "Range": f"bytes={start}-{end}"}
+    if etag:
+        params["IfMatch"] = etag
+    return s3.get_object(**params)["Body"].read()
+
+
+def _zip64_extra(extra: bytes, usize: int, csize: int, offset: int) -> tuple[int, int, int]:
+    """Resolve 0xFFFFFFFF placeholders from the ZIP64 extended-information extra field."""
+    pos = 0
+    while pos + 4 <= len(extra):
+        hid, hlen = struct.unpack_from("<HH", extra, pos)
+        body = extra[pos + 4: pos + 4 + hlen]
+        if hid == 0x0001:
+            vals = list(struct.unpack_from(f"<{len(body) // 8}Q", body))
+            if usize == 0xFFFFFFFF and vals:
+                usize = vals.pop(0)
+            if csize == 0xFFFFFFFF and vals:
+                csize = vals.pop(0)
+            if offset == 0xFFFFFFFF and vals:
+                offset = vals.pop(0)
+            break
+        pos += 4 + hlen
+    return usize, csize, offset
+
+
+def _parse_central_directory(data: bytes) -> List[Dict[str, Any]]:
+    entries = []
+    pos = 0
+    while pos + _CDIR_LEN <= len(data) and data[pos:pos + 4] == _CDIR_SIG:
+        (_, _, _, flags, method, _, _, _, csize, usize,
+         n_len, x_len, c_len, _, _, _, offset) = struct.unpack_from("<4s6H3L5H2L", data, pos)
+        name_raw = data[pos + _CDIR_LEN: pos + _CDIR_LEN + n_len]
+        extra = data[pos + _CDIR_LEN + n_len: pos + _CDIR_LEN + n_len + x_len]
+        usize, csize, offset = _zip64_extra(extra, usize, csize, offset)
+        entries.append({
+            "name": name_raw.decode("utf-8" if flags & 0x800 else "cp437", "replace"),
+            "method": method,
+            "csize": csize,
+            "usize": usize,
+            "offset": offset,
+        })
+        pos += _CDIR_LEN + n_len + x_len + c_len
+    return entries
+
+
+def read_central_directory(s3, bucket: str, key: str, *, size: int, etag: str | None = None) -> List[Dict[str, Any]]:
+    """
+    Locate the end-of-central-directory with one tail GET and return the entry list.
+    A second GET is only needed when the central directory does not fit in the tail.
+    """
+    if size < _EOCD_LEN:
+        raise ZipReadError("object too small to be a zip")
+
+    tail_start = max(0, size - _TAIL_BYTES)
+    tail = _range_get(s3, bucket, key, tail_start, size - 1, etag)
+
+    eocd = tail.rfind(_EOCD_SIG)
+    if eocd < 0 or eocd + _EOCD_LEN > len(tail):
+        raise ZipReadError("end-of-central-directory not found")
+    (_, _, _, _, total, cd_size, cd_offset, _) = struct.unpack_from("<4s4H2LH", tail, eocd)
+
+    # ZIP64: sizes/offsets live in the zip64 EOCD record referenced by the locator
+    if cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF or total == 0xFFFF:
+        loc = eocd - _ZIP64_LOCATOR_LEN
+        if loc < 0 or tail[loc:loc + 4] != _ZIP64_LOCATOR_SIG:
+            raise ZipReadError("zip64 locator not found")
+        (_, _, z64_offset, _) = struct.unpack_from("<4sLQL", tail, loc)
+        rel = z64_offset - tail_start
+        if 0 <= rel and rel + _ZIP64_EOCD_LEN <= len(tail):
+            rec = tail[rel:rel + _ZIP64_EOCD_LEN]
+        else:
+            rec = _range_get(s3, bucket, key, z64_offset, z64_offset + _ZIP64_EOCD_LEN - 1, etag)
+        if rec[:4] != _ZIP64_EOCD_SIG:
+            raise ZipReadError("zip64 end-of-central-directory not found")
+        (_, _, _, _, _, _, _, _, cd_size, cd_offset) = struct.unpack_from("<4sQ2H2L4Q", rec)
+
+    rel = cd_offset - tail_start
+    if 0 <= rel and rel + cd_size <= len(tail):
+        cd = tail[rel:rel + cd_size]
+    else:
+        cd = _range_get(s3, bucket, key, cd_offset, cd_offset + cd_size - 1, etag)
+    return _parse_central_directory(cd)
+
+
+def read_entry(s3, bucket: str, key: str, entry: Dict[str, Any], *, etag: str | None = None) -> bytes:
+    """Fetch a single member (local header + compressed data) and inflate it."""
+    if entry["usize"] > _MAX_ENTRY_BYTES or entry["csize"] > _MAX_ENTRY_BYTES:
+        raise ZipReadError(f"entry too large: {entry['name']}")
+
+    # Local extra length can differ from the central one; over-fetch a little and top up if short
+    start = entry["offset"]
+    want = _LOCAL_LEN + len(entry["name"].encode("utf-8")) + 256 + entry["csize"]
+    blob = _range_get(s3, bucket, key, start, start + want - 1, etag)
+    if blob[:4] != _LOCAL_SIG:
+        raise ZipReadError(f"local header not found: {entry['name']}")
+    n_len, x_len = struct.unpack_from("<HH", blob, 26)
+    data_start = _LOCAL_LEN + n_len + x_len
+    data_end = data_start + entry["csize"]
+    if data_end > len(blob):
+        blob += _range_get(s3, bucket, key, start + len(blob), start + data_end - 1, etag)
+    raw = blob[data_start:data_end]
+
+    if entry["method"] == 0:
+        return raw
+    if entry["method"] == 8:
+        return zlib.decompressobj(-15).decompress(raw, _MAX_ENTRY_BYTES)
+    raise ZipReadError(f"unsupported compression method {entry['method']}: {entry['name']}")
+
+
+def _pick_version_entry(entries: List[Dict[str, Any]], preferred: str | None) -> Optional[Dict[str, Any]]:
+    by_name = {e["name"]: e for e in entries}
+    if preferred and preferred in by_name:
+        return by_name[preferred]
+    poms = [e for e in entries if re.fullmatch(r"META-INF/maven/[^/]+/[^/]+/pom\.properties", e["name"])]
+    if len(poms) == 1:
+        return poms[0]
+    return by_name.get("META-INF/MANIFEST.MF")
+
+
+def parse_version(name: str, text: str) -> Optional[str]:
+    """version= from pom.properties, or *-Version: from MANIFEST.MF."""
+    if name.endswith("pom.properties"):
+        for line in text.splitlines():
+            if line.startswith("version="):
+                return line.split("=", 1)[1].strip() or None
+        return None
+    headers = {}
+    for line in text.splitlines():
+        if ":" in line and not line.startswith(" "):
+            k, v = line.split(":", 1)
+            headers[k.strip()] = v.strip()
+    for k in _MANIFEST_KEYS:
+        if headers.get(k):
+            return headers[k]
+    return None
+
+
+def read_jar_version(s3, bucket: str, key: str, *, size: int, etag: str) -> Optional[str]:
+    """
+    Extract a jar's version with ranged GETs (EOCD/central directory + one entry).
+    Results (including "no version found") are cached by ETag, so each object
+    is only ever read once.
+    """
+    cache_key = f"jarver:v1:{etag.strip(chr(34))}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached.get("version")
+
+    version = None
+    try:
+        entries = read_central_directory(s3, bucket, key, size=size, etag=etag)
+        basename = key.rsplit("/", 1)[-1]
+        entry = _pick_version_entry(entries, JAR_VERSION_ENTRIES.get(basename))
+        if entry:
+            text = read_entry(s3, bucket, key, entry, etag=etag).decode("utf-8", "replace")
+            version = parse_version(entry["name"], text)
+    except Exception:
+        # Not cached: a transient S3 error should not pin "no version" to this ETag
+        current_app.logger.exception("jar_version_read_failed: s3://%s/%s", bucket, key)
+        return None
+
+    cache.set(cache_key, {"version": version}, timeout=0)
+    current_app.app_log.info("jar_version_read", extra={"key": key, "version": version})
+    return version
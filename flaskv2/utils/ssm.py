@@ -1,9 +1,11 @@
 
 
+import json
+import re
 import shlex
 from typing import Any, Dict, List, Optional
 
-import boto3
+from flaskv2.utils.aws import get_client
 
 
 def ssm_run_shell(
@@ -55,10 +57,67 @@ def ssm_run_shell(
     if comment:
         params["Comment"] = comment
 
-    ssm = boto3.client("ssm", region_name=region)
+    ssm = get_client("ssm", region)
     resp = ssm.send_command(**params)
     return resp["Command"]["CommandId"]
 
+def ssm_run_powershell(
+    *,
+    instance_ids: List[str],
+    commands: List[str],
+    region: str = "us-east-1",
+    timeout_seconds: int = 60,
+    comment: Optional[str] = None,
+) -> str:
+    """Send an AWS-RunPowerShellScript command (Windows hosts); returns the SSM CommandId."""
+    if not instance_ids:
+        raise ValueError("instance_ids must be non-empty")
+    params: Dict[str, Any] = {
+        "InstanceIds": instance_ids,
+        "DocumentName": "AWS-RunPowerShellScript",
+        "Parameters": {"commands": commands},
+        "CloudWatchOutputConfig": {"CloudWatchOutputEnabled": False},
+        "TimeoutSeconds": timeout_seconds,
+    }
+    if comment:
+        params["Comment"] = comment
+    ssm = get_client("ssm", region)
+    return ssm.send_command(**params)["Command"]["CommandId"]
+
+
+# Get-Volume -> JSON: DriveLetter, FileSystemLabel, Size, SizeRemaining
+VOLUMES_PS_SCRIPT = r"""
+$vols = Get-Volume | Where-Object { $_.DriveLetter -ne $null }
+$vols | Select-Object DriveLetter, FileSystemLabel,
+    @{n='Size';e={[int64]$_.Size}},
+    @{n='SizeRemaining';e={[int64]$_.SizeRemaining}} | ConvertTo-Json -Depth 3
+""".strip()
+
+
+def parse_volumes(output: str) -> List[Dict[str, Any]]:
+    """VOLUMES_PS_SCRIPT stdout -> [{drive, label, size_gib, used_gib, free_gib}]. Raises ValueError."""
+    data = json.loads(output)
+    # PowerShell returns either an object or an array
+    volumes = data if isinstance(data, list) else [data]
+    gib = 1024 ** 3
+    result = []
+    for v in volumes:
+        size_b = int(v.get("Size") or 0)
+        free_b = int(v.get("SizeRemaining") or 0)
+        used_b = max(size_b - free_b, 0)
+        result.append({
+            "drive": str(v.get("DriveLetter") or "").upper(),
+            "label": v.get("FileSystemLabel") or "",
+            "size_gib": round(size_b / gib, 2),
+            "used_gib": round(used_b / gib, 2),
+            "free_gib": round(free_b / gib, 2),
+        })
+    return result
+
+
+TERMINAL_STATUSES = ("Success", "Cancelled", "Failed", "TimedOut")
+
+
 def ssm_get_command_status(
     *,
     command_id: str,
@@ -69,8 +128,13 @@ def ssm_get_command_status(
     Read back status + stdout/stderr (and S3/CW URLs if enabled).
     Uses GetCommandInvocation so we can also surface StandardOutputUrl.
     """
-    ssm = boto3.client("ssm", region_name=region)
-    inv = ssm.get_command_invocation(CommandId=command_id, InstanceId=instance_id)
+    ssm = get_client("ssm", region)
+    try:
+        inv = ssm.get_command_invocation(CommandId=command_id, InstanceId=instance_id)
+    except ssm.exceptions.InvocationDoesNotExist:
+        # Right after send_command the invocation may not be registered yet
+        return {"ok": True, "status": "Pending", "status_details": "Pending", "stdout": "", "stderr": "",
+                "stdout_url": "", "stderr_url": ""}
 
     return {
         "ok": True,
@@ -83,6 +147,79 @@ def ssm_get_command_status(
     }
 
 
+def ssm_list_command_invocations(*, command_id: str, region: str = "us-east-1") -> Dict[str, Dict[str, Any]]:
+    """
+    Every target of one command in a single paginated call:
+    {instance_id: {status, status_details, stdout}}.
+    Plugin output here is capped at 2500 chars (ssm_get_command_status returns more).
+    Targets that have not registered yet are simply missing.
+    """
+    ssm = get_client("ssm", region)
+    result: Dict[str, Dict[str, Any]] = {}
+    for page in ssm.get_paginator("list_command_invocations").paginate(CommandId=command_id, Details=True):
+        for inv in page.get("CommandInvocations", []):
+            plugins = inv.get("CommandPlugins") or [{}]
+            result[inv["InstanceId"]] = {
+                "status": inv.get("Status") or "Pending",
+                "status_details": inv.get("StatusDetails") or "",
+                "stdout": plugins[0].get("Output") or "",
+            }
+    return result
+
+
+def aggregate_status(statuses: List[str], expected: int) -> str:
+    """One status for a multi-instance command: Pending/InProgress until every target is terminal."""
+    if len(statuses) < expected or not statuses:
+        return "InProgress" if statuses else "Pending"
+    if any(s not in TERMINAL_STATUSES for s in statuses):
+        return "InProgress"
+    # Uniform outcome (all Success, all TimedOut, ...) passes through; a mix counts as Failed
+    return statuses[0] if len(set(statuses)) == 1 else "Failed"
+
+
+# Sync mode: $DEST/.inject-meta holds "name<TAB>size<TAB>etag" per injected file.
+# Every script drops a file's entry before it copies or removes that file, so an
+# entry only ever describes what a sync inject itself put there.
+_META_FUNCS = [
+    'META="$DEST/.inject-meta"',
+    r"""forget_meta() { [ -f "$META" ] || return 0; awk -F'\t' -v n="$1" '$1 != n' "$META" > "$META.tmp" && mv "$META.tmp" "$META"; }""",
+]
+_SYNC_FUNCS = [
+    'SKIPPED=""',
+    r"""is_current() { [ -f "$DEST/$1" ] && [ "$(stat -c %s "$DEST/$1")" = "$2" ] && grep -qxF "$(printf '%s\t%s\t%s' "$1" "$2" "$3")" "$META" 2>/dev/null; }""",
+    r"""record_meta() { { awk -F'\t' -v n="$1" '$1 != n' "$META" 2>/dev/null || true; printf '%s\t%s\t%s\n' "$1" "$2" "$3"; } > "$META.tmp" && mv "$META.tmp" "$META"; }""",
+]
+
+
+def _sync_args(name: str, sig: tuple[int, str]) -> str:
+    """'<basename> <size> <etag>' for is_current / record_meta."""
+    return f"{shlex.quote(name.rsplit('/', 1)[-1])} {int(sig[0])} {shlex.quote(sig[1])}"
+
+
+def _forget(name: str) -> str:
+    return f"forget_meta {shlex.quote(name.rsplit('/', 1)[-1])}"
+
+
+def _sync_skip(name: str) -> str:
+    base = name.rsplit("/", 1)[-1]
+    return f'echo "[skip] {base} (unchanged)"; SKIPPED="$SKIPPED {base}"'
+
+
+# What lars_source_checks accepts as a sidecar checksum; anything else is not sent to the host
+SHA256_RE = re.compile(r"[0-9a-f]{64}")
+_SAFE_NAME_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._+-]*")
+
+# Direct mode: download to a .part file, verify size/sha256 when known, then move into place
+_FETCH_FUNC = (
+    'fetch_one() { local rc=0 part="$DEST/.$3.part"; '
+    'curl -fsSL --retry 3 -o "$part" "$2" || rc=$?; '
+    'if [ "$rc" -eq 0 ] && [ -n "$4" ] && [ "$(stat -c %s "$part")" != "$4" ]; then echo "[error] size mismatch: $3"; rc=90; fi; '
+    'if [ "$rc" -eq 0 ] && [ -n "$5" ] && ! echo "$5  $part" | sha256sum -c --status; then echo "[error] sha256 mismatch: $3"; rc=91; fi; '
+    'if [ "$rc" -eq 0 ]; then mv -f "$part" "$DEST/$3"; echo "[sha256] $(sha256sum "$DEST/$3" | cut -d" " -f1)  $3"; else rm -f "$part"; fi; '
+    'echo "$rc" > "$WORK/$1.rc"; }'
+)
+
+
 def build_inject_lines(
     *,
     bucket: str,
@@ -96,6 +233,12 @@ def build_inject_lines(
     list_filter_regex: str | None = None,
     extra_before: list[str] | None = None,       # injected after set -euo...
     extra_after: list[str] | None = None,        # injected before final listing
+    parallel: int = 1,                           # >1 => up to N concurrent 'aws s3 cp'
+    s3_max_concurrent_requests: int | None = None,   # AWS CLI s3 transfer tuning (temp config)
+    s3_multipart_chunksize: str | None = None,       # e.g. "64MB"
+    sync_signatures: dict[str, tuple[int, str]] | None = None,   # name -> (size, etag) => skip unchanged
+    source_urls: dict[str, str] | None = None,   # name -> URL => download directly, no S3 hop
+    source_checks: dict[str, tuple[int | None, str | None]] | None = None,   # name -> (size, sha256)
 ) -> list[str]:
     """
     Build shell lines for the 'inject builds' task, with configurable knobs.
@@ -104,6 +247,23 @@ def build_inject_lines(
     - Set filtered_listing=False for a full 'ls -lah "$DEST"'.
     - Tweak list_filter_regex to change what 'grep -E' shows (only used if filtered_listing=True).
     - Put any one-off commands in extra_before/extra_after.
+    - parallel>1 runs the copies as background jobs (at most `parallel` at once),
+      records each exit code and fails after all of them finished if any failed.
+    - s3_max_concurrent_requests / s3_multipart_chunksize go into a temporary
+      AWS_CONFIG_FILE (a copy of the user's), so the host's config is untouched.
+    - sync_signatures turns on sync mode: a file whose on-disk size matches and
+      whose (size, etag) an earlier inject recorded in $DEST/.inject-meta is
+      skipped ("[skip]" lines plus a summary). Copied files are recorded, and
+      synced files are left out of the pre-clear. Files without a signature
+      are always copied. Any copy, download or pre-clear (sync or not) first
+      drops that file's entry, so a file replaced by another inject is never
+      skipped on the strength of a stale entry.
+    - source_urls switches to direct mode: the host curls each file from its URL
+      (e.g. the LARS source_url from plan_artifacts) in parallel, checks the
+      size/sha256 from source_checks when given, prints each file's sha256 and
+      only then moves it into $DEST. bucket/root/key_prefix and sync are unused.
+      File names must be plain file names and sha256 values 64 lowercase hex
+      digits (ValueError otherwise); every value is shell-quoted.
     """
     s3_base = f"s3://{bucket}/{root}{key_prefix}"
     lines: list[str] = []
@@ -121,20 +281,91 @@ def build_inject_lines(
     if extra_before:
         lines.extend(extra_before)
 
-    # Pre-clear (if configured)
-    names =  preclear_names
+    direct = bool(source_urls)
+    sync = {} if direct else {name: (int(size), etag.strip('"')) for name, (size, etag) in (sync_signatures or {}).items()}
+    lines.extend(_META_FUNCS)
+    if sync:
+        lines.extend(_SYNC_FUNCS)
+
+    # Pre-clear (if configured); synced files stay so they can be compared
+    synced = {name.rsplit("/", 1)[-1] for name in sync}
+    names = [n for n in (preclear_names or []) if n not in synced]
     if names:
         lines.append('echo "[info] pre-clearing known files"')
         for fname in names:
             lines.append(f'echo " - rm -f $DEST/{fname}"')
             lines.append(f'rm -f "$DEST/{fname}" || true')
+            lines.append(_forget(fname))
+
+    # Per-run scratch dir (exit codes, temp AWS config), removed on exit
+    tuned = bool(s3_max_concurrent_requests or s3_multipart_chunksize)
+    if parallel > 1 or tuned or direct:
+        lines.append('WORK="$(mktemp -d)"')
+        lines.append("trap 'rm -rf \"$WORK\"' EXIT")
+    if tuned:
+        lines.append('cp "${AWS_CONFIG_FILE:-$HOME/.aws/config}" "$WORK/aws_config" 2>/dev/null || touch "$WORK/aws_config"')
+        lines.append('export AWS_CONFIG_FILE="$WORK/aws_config"')
+        if s3_max_concurrent_requests:
+            lines.append(f"aws configure set default.s3.max_concurrent_requests {int(s3_max_concurrent_requests)}")
+        if s3_multipart_chunksize:
+            lines.append(f"aws configure set default.s3.multipart_chunksize {shlex.quote(s3_multipart_chunksize)}")
 
     # Copy selected files
-    lines.append('echo "[info] copying selected files"')
-    for name in files:
-        s3_src = f"{s3_base}{name}"
-        lines.append(f'echo " - aws s3 cp {s3_src} $DEST/"')
-        lines.append(f'aws s3 cp "{s3_src}" "$DEST/" --only-show-errors')
+    if parallel > 1 or direct:
+        parallel = max(parallel, 1)
+        source = "source URLs" if direct else "S3"
+        lines.append(f'echo "[info] copying selected files from {source} (up to {parallel} at a time)"')
+        # `cmd || rc=$?` keeps set -e from killing the job before its exit code is recorded
+        if direct:
+            lines.append(_FETCH_FUNC)
+        else:
+            lines.append('copy_one() { local rc=0; aws s3 cp "$2" "$DEST/" --only-show-errors || rc=$?; echo "$rc" > "$WORK/$1.rc"; }')
+        for i, name in enumerate(files):
+            if name in sync:
+                lines.append(f'if is_current {_sync_args(name, sync[name])}; then {_sync_skip(name)}; echo 0 > "$WORK/{i}.rc"; else')
+            # in the foreground, before the job starts, so the background copies never race on $META
+            lines.append(_forget(name))
+            lines.append(f'while [ "$(jobs -rp | wc -l)" -ge {parallel} ]; do wait -n || true; done')
+            if direct:
+                url = source_urls[name]
+                size, sha = (source_checks or {}).get(name) or (None, None)
+                if not _SAFE_NAME_RE.fullmatch(name):
+                    raise ValueError(f"unsafe file name for direct inject: {name!r}")
+                if sha is not None and not SHA256_RE.fullmatch(sha):
+                    raise ValueError(f"invalid sha256 for {name}: {sha!r}")
+                size = str(int(size)) if size is not None else ""
+                lines.append(f'echo " - curl "{shlex.quote(url)}" -> $DEST/{name} (background)"')
+                lines.append(f'fetch_one {i} {shlex.quote(url)} {shlex.quote(name)} {shlex.quote(size)} {shlex.quote(sha or "")} &')
+            else:
+                s3_src = f"{s3_base}{name}"
+                lines.append(f'echo " - aws s3 cp {s3_src} $DEST/ (background)"')
+                lines.append(f'copy_one {i} "{s3_src}" &')
+            if name in sync:
+                lines.append("fi")
+        lines.append("wait || true")
+        lines.append("FAILED=0")
+        for i, name in enumerate(files):
+            # meta is written here, after the jobs, so concurrent copies never race on it
+            record = f"; else record_meta {_sync_args(name, sync[name])}" if name in sync else ""
+            lines.append(
+                f'rc="$(cat "$WORK/{i}.rc" 2>/dev/null || echo 1)"; '
+                f'if [ "$rc" -ne 0 ]; then echo "[error] copy failed (rc=$rc): {name}"; FAILED=1{record}; fi'
+            )
+        lines.append('[ "$FAILED" -eq 0 ] || exit 1')
+    else:
+        lines.append('echo "[info] copying selected files"')
+        for name in files:
+            s3_src = f"{s3_base}{name}"
+            if name in sync:
+                lines.append(f"if is_current {_sync_args(name, sync[name])}; then {_sync_skip(name)}; else")
+            lines.append(_forget(name))
+            lines.append(f'echo " - aws s3 cp {s3_src} $DEST/"')
+            lines.append(f'aws s3 cp "{s3_src}" "$DEST/" --only-show-errors')
+            if name in sync:
+                lines.append(f"record_meta {_sync_args(name, sync[name])}")
+                lines.append("fi")
+    if sync:
+        lines.append('[ -z "$SKIPPED" ] || echo "[info] skipped unchanged:$SKIPPED"')
 
     # Optional: user-provided post-steps (before listing)
     if extra_after:
@@ -162,7 +393,7 @@ def build_inject_lines(
 
 def send_inject_command(
     *,
-    instance_id: str,
+    instance_ids: list[str],
     bucket: str,
     root: str,
     key_prefix: str,
@@ -177,7 +408,13 @@ def send_inject_command(
     filtered_listing: bool = True,
     list_filter_regex: str | None = None, # r"Install-.*\.jar|mt[_]dependencies\.txt",
     extra_before: list[str] | None = None,
-    extra_after: list[str] | None = None
+    extra_after: list[str] | None = None,
+    parallel: int = 1,
+    s3_max_concurrent_requests: int | None = None,
+    s3_multipart_chunksize: str | None = None,
+    sync_signatures: dict[str, tuple[int, str]] | None = None,
+    source_urls: dict[str, str] | None = None,
+    source_checks: dict[str, tuple[int | None, str | None]] | None = None,
 ) -> str:
     lines = build_inject_lines(
         bucket=bucket,
@@ -190,13 +427,21 @@ def send_inject_command(
         filtered_listing=filtered_listing,
         list_filter_regex=list_filter_regex,
         extra_before=extra_before,
-        extra_after=extra_after
+        extra_after=extra_after,
+        parallel=parallel,
+        s3_max_concurrent_requests=s3_max_concurrent_requests,
+        s3_multipart_chunksize=s3_multipart_chunksize,
+        sync_signatures=sync_signatures,
+        source_urls=source_urls,
+        source_checks=source_checks,
     )
+    target = instance_ids[0] if len(instance_ids) == 1 else f"{len(instance_ids)} instances"
+    origin = "source URLs" if source_urls else f"s3://{bucket}/{root}{key_prefix}"
     return ssm_run_shell(
-        instance_ids=[instance_id],
+        instance_ids=instance_ids,
         lines=lines,
         region=region,
         run_as_user=run_as_user,
         use_login_shell=use_login_shell,
-        comment=f"Inject builds to {instance_id} from s3://{bucket}/{root}{key_prefix}",
+        comment=f"Inject builds to {target} from {origin}"[:100],   # SSM Comment limit
     )
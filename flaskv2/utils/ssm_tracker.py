@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+
+from flaskv2.extensions import cache
+from flaskv2.utils.background import PeriodicTask
+from flaskv2.utils.ssm import TERMINAL_STATUSES, aggregate_status, ssm_get_command_status, ssm_list_command_invocations
+
+RESULT_KEY = "ssm_result:v1:{}"
+
+
+class TrackedCommand:
+    __slots__ = ("command_id", "region", "expected", "invocations", "status", "version",
+                 "interval", "next_poll", "last_seen")
+
+    def __init__(self, command_id: str, region: str, expected: int, interval: float):
+        self.command_id = command_id
+        self.region = region
+        self.expected = expected
+        self.invocations: Dict[str, Dict[str, Any]] = {}
+        self.status = "Pending"
+        self.version = 0
+        self.interval = interval
+        self.next_poll = 0.0
+        self.last_seen = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "status": self.status,
+            "done": self.status in TERMINAL_STATUSES,
+            "counts": dict(Counter(inv["status"] for inv in self.invocations.values())),
+            "invocations": self.invocations,
+        }
+
+
+class CommandTracker:
+    """
+    One server-side poller for every SSM command the UI is watching.
+
+    Each active command is listed once per interval (list_command_invocations
+    covers all of its instances), backing off from SSM_POLL_MIN_SECONDS to
+    SSM_POLL_MAX_SECONDS while nothing changes. Browsers read snapshots or
+    long-poll wait() instead of calling SSM themselves, so AWS traffic scales
+    with active commands rather than open tabs.
+
+    Terminal results are kept (memory + cache, no expiry) and never polled again.
+    Commands nobody has asked about for SSM_TRACK_IDLE_SECONDS are dropped.
+    """
+
+    def __init__(self, done_max: int = 500):
+        self._cond = threading.Condition()
+        self._active: Dict[str, TrackedCommand] = {}
+        self._done: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._done_max = done_max
+        self._task: PeriodicTask | None = None
+
+    def _cfg(self, key: str, default: float) -> float:
+        return float(current_app.config.get(key, default))
+
+    def _ensure_started(self) -> None:
+        if self._task is None or not self._task.running:
+            if self._task is None:
+                self._task = PeriodicTask("ssm-tracker", self._tick, self._cfg("SSM_POLL_MIN_SECONDS", 1))
+            self._task.start(current_app._get_current_object())
+
+    def _finished(self, command_id: str) -> Optional[Dict[str, Any]]:
+        if command_id in self._done:
+            self._done.move_to_end(command_id)
+            return self._done[command_id]
+        snap = cache.get(RESULT_KEY.format(command_id))
+        if snap:
+            self._remember(command_id, snap)
+        return snap
+
+    def _remember(self, command_id: str, snap: Dict[str, Any]) -> None:
+        self._done[command_id] = snap
+        while len(self._done) > self._done_max:
+            self._done.popitem(last=False)
+
+    def track(self, command_id: str, region: str, instance_ids: List[str]) -> None:
+        """Start following a command (idempotent)."""
+        with self._cond:
+            if command_id in self._active or self._finished(command_id):
+                return
+            cmd = TrackedCommand(command_id, region, len(instance_ids), self._cfg("SSM_POLL_MIN_SECONDS", 1))
+            cmd.invocations = {iid: {"status": "Pending", "status_details": "Pending", "stdout": "", "stderr": ""}
+                               for iid in instance_ids}
+            self._active[command_id] = cmd
+        self._ensure_started()
+        self._task.trigger()
+
+    def snapshot(self, command_id: str) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            if command_id in self._active:
+                cmd = self._active[command_id]
+                cmd.last_seen = time.time()
+                return cmd.snapshot()
+            return self._finished(command_id)
+
+    def wait(self, command_id: str, since: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """Block up to `timeout` for a snapshot newer than version `since`."""
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                snap = self.snapshot(command_id)
+                remaining = deadline - time.time()
+                if snap is None or snap["version"] > since or snap["done"] or remaining <= 0:
+                    return snap
+                self._cond.wait(remaining)
+
+    # ---------- worker ----------
+
+    def _tick(self) -> None:
+        now = time.time()
+        idle = self._cfg("SSM_TRACK_IDLE_SECONDS", 600)
+        with self._cond:
+            for cid in [cid for cid, c in self._active.items() if now - c.last_seen > idle]:
+                del self._active[cid]
+            due = [c for c in self._active.values() if c.next_poll <= now]
+        for cmd in due:
+            try:
+                self._poll(cmd)
+            except Exception:
+                current_app.logger.exception("ssm_tracker_poll_failed: command=%s", cmd.command_id)
+                cmd.next_poll = time.time() + self._cfg("SSM_POLL_MAX_SECONDS", 15)
+
+    def _poll(self, cmd: TrackedCommand) -> None:
+        listed = ssm_list_command_invocations(command_id=cmd.command_id, region=cmd.region)
+        invocations = dict(cmd.invocations)
+        for iid, inv in listed.items():
+            invocations[iid] = {**invocations.get(iid, {}), **inv}
+        status = aggregate_status([inv["status"] for inv in invocations.values()], cmd.expected)
+
+        if status in TERMINAL_STATUSES and len(invocations) == 1:
+            # The listing caps output at 2500 chars; fetch the full stdout/stderr once for single targets
+            (iid,) = invocations
+            full = ssm_get_command_status(command_id=cmd.command_id, instance_id=iid, region=cmd.region)
+            invocations[iid] = {k: full[k] for k in ("status", "status_details", "stdout", "stderr")}
+
+        changed = invocations != cmd.invocations or status != cmd.status
+        with self._cond:
+            if changed:
+                cmd.invocations = invocations
+                cmd.status = status
+                cmd.version += 1
+                cmd.interval = self._cfg("SSM_POLL_MIN_SECONDS", 1)
+            else:
+                cmd.interval = min(cmd.interval * 2, self._cfg("SSM_POLL_MAX_SECONDS", 15))
+            cmd.next_poll = time.time() + cmd.interval
+            if status in TERMINAL_STATUSES:
+                snap = cmd.snapshot()
+                del self._active[cmd.command_id]
+                self._remember(cmd.command_id, snap)
+                cache.set(RESULT_KEY.format(cmd.command_id), snap, timeout=0)
+            if changed:
+                self._cond.notify_all()
+
+    def stats(self) -> Tuple[int, int]:
+        """(active, finished-in-memory) command counts."""
+        with self._cond:
+            return len(self._active), len(self._done)
+
+
+command_tracker = CommandTracker()
@@ -0,0 +1,146 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Single place to classify a stack given its instance states
+def classify_stack(states: List[str]) -> str:
+    if not states:
+        return "Unknown"
+    all_running = all(s == "running" for s in states)
+    all_stopped = all(s == "stopped" for s in states)
+    opening = (any(s == "pending" for s in states) or any(s == "running" for s in states)) and any(s == "stopped" for s in states)
+    closing = any(s == "stopping" for s in states)
+    if all_running:
+        return "Running"
+    if all_stopped:
+        return "Off"
+    if opening and not closing:
+        return "Opening"
+    if closing and not opening:
+        return "Closing"
+    return "Degraded"
+
+
+REQUIRED_ROLES = {
+    "INFORBCLM01LInstance",
+    "INFORBCVP01Instance",
+    "INFORBCDB01Instance",
+    "INFORBCAD01Instance",
+}
+
+LANDMARK_ROLE = "INFORBCLM01LInstance"
+
+STACK_STATES = ["Running", "Off", "Opening", "Closing", "Degraded", "Unknown"]
+
+
+@dataclass(slots=True)
+class RoleInstance:
+    instance_id: str
+    state: str
+
+
+@dataclass(slots=True)
+class Stack:
+    """
+    One CloudFormation stack. `instances` ({instance_id: state}) is the source
+    of truth for states; `state` is its classification, computed once.
+    """
+    name: str
+    region: str
+    client: Optional[str] = None
+    env: Optional[str] = None
+    alwayson: str = "Off"
+    instances: Dict[str, str] = field(default_factory=dict)
+    roles: Dict[str, RoleInstance] = field(default_factory=dict)   # logical id -> instance
+    state: str = "Unknown"
+
+    @property
+    def states(self) -> List[str]:
+        return list(self.instances.values())
+
+    @property
+    def instance_ids(self) -> List[str]:
+        return list(self.instances)
+
+    @property
+    def running_ids(self) -> List[str]:
+        return [iid for iid, st in self.instances.items() if st == "running"]
+
+    @property
+    def fully_running(self) -> bool:
+        return all(rid in self.roles and self.roles[rid].state == "running" for rid in REQUIRED_ROLES)
+
+    def classify(self) -> "Stack":
+        self.state = classify_stack(self.states)
+        return self
+
+    def with_states(self, states: Dict[str, str]) -> Optional["Stack"]:
+        """A reclassified copy if any of our instances changed state, else None."""
+        if all(states.get(iid, st) == st for iid, st in self.instances.items()):
+            return None
+        instances = {iid: states.get(iid, st) for iid, st in self.instances.items()}
+        roles = {lid: RoleInstance(r.instance_id, instances.get(r.instance_id, r.state)) for lid, r in self.roles.items()}
+        return Stack(self.name, self.region, self.client, self.env, self.alwayson, instances, roles).classify()
+
+    def summary(self) -> Dict[str, Any]:
+        """Row for the Instances page / /api/stacks."""
+        return {
+            "name": self.name,
+            "client": self.client or "-",
+            "state": self.state,
+            "alwayson": self.alwayson,
+            "region": self.region,
+        }
+
+    def landmark_target(self) -> Optional[Dict[str, Any]]:
+        """The Landmark app instance, if every required role is running."""
+        lm = self.roles.get(LANDMARK_ROLE)
+        if not self.fully_running or not lm:
+            return None
+        return {"id": lm.instance_id, "name": self.name, "env": self.env or "", "region": self.region}
+
+    # Compact form for caching: positional tuples, no per-field keys
+    def to_row(self) -> Tuple:
+        return (
+            self.name, self.region, self.client, self.env, self.alwayson,
+            tuple(self.instances.items()),
+            tuple((lid, r.instance_id) for lid, r in self.roles.items()),
+        )
+
+    @classmethod
+    def from_row(cls, row: Tuple) -> "Stack":
+        name, region, client, env, alwayson, instances, roles = row
+        instances = dict(instances)
+        return cls(
+            name, region, client, env, alwayson, instances,
+            {lid: RoleInstance(iid, instances.get(iid, "")) for lid, iid in roles},
+        ).classify()
+
+
+@dataclass(slots=True)
+class StackView:
+    """
+    A stack snapshot plus the aggregates the pages need, computed once per
+    collection instead of on every request.
+    """
+    stacks: Dict[str, Stack]
+    summary: List[Dict[str, Any]] = field(default_factory=list)       # sorted by name
+    state_counts: Dict[str, int] = field(default_factory=dict)
+    targets: List[Dict[str, Any]] = field(default_factory=list)       # running Landmark instances
+
+    @classmethod
+    def build(cls, stacks: Dict[str, Stack]) -> "StackView":
+        ordered = [stacks[name] for name in sorted(stacks)]
+        return cls(
+            stacks=stacks,
+            summary=[s.summary() for s in ordered],
+            state_counts=dict(Counter(s.state for s in ordered)),
+            targets=[t for t in (s.landmark_target() for s in ordered) if t],
+        )
+
+    def dump(self) -> List[Tuple]:
+        return [s.to_row() for s in self.stacks.values()]
+
+    @classmethod
+    def load(cls, rows: List[Tuple]) -> "StackView":
+        return cls.build({row[0]: Stack.from_row(row) for row in rows})
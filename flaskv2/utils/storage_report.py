@@ -0,0 +1,173 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+
+from flaskv2.extensions import cache
+from flaskv2.utils.ssm import TERMINAL_STATUSES, VOLUMES_PS_SCRIPT, parse_volumes, ssm_list_command_invocations, ssm_run_powershell
+from flaskv2.utils.stack_model import Stack
+
+REPORT_KEY = "storage_report:v1"
+DB_ROLE = "INFORBCDB01Instance"
+SEND_COMMAND_MAX_IDS = 50     # SendCommand InstanceIds limit
+
+# One report at a time per process; a second "run" joins the one in flight
+_report_lock = threading.Lock()
+_report_job: Optional[Dict[str, Any]] = None
+
+
+def get_storage_report() -> Optional[Dict[str, Any]]:
+    """Last finished report (cached for STORAGE_REPORT_TTL), or None."""
+    return cache.get(REPORT_KEY)
+
+
+def get_storage_report_job() -> Optional[Dict[str, Any]]:
+    with _report_lock:
+        return dict(_report_job) if _report_job else None
+
+
+def _row(stack: Stack, instance_id: Optional[str], status: str, *, volumes=None, error: str | None = None) -> Dict[str, Any]:
+    volumes = volumes or []
+    worst = min(volumes, key=lambda v: v["free_gib"] / v["size_gib"] if v["size_gib"] else 1, default=None)
+    return {
+        "stack": stack.name,
+        "region": stack.region,
+        "client": stack.client or "-",
+        "instance_id": instance_id,
+        "status": status,
+        "error": error,
+        "volumes": volumes,
+        "size_gib": round(sum(v["size_gib"] for v in volumes), 2),
+        "free_gib": round(sum(v["free_gib"] for v in volumes), 2),
+        "worst_drive": worst["drive"] if worst else None,
+        "worst_free_gib": worst["free_gib"] if worst else None,
+        "worst_free_pct": round(100 * worst["free_gib"] / worst["size_gib"], 1) if worst and worst["size_gib"] else None,
+    }
+
+
+def _collect_invocations(region: str, command_id: str, expected: int, deadline: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Poll ssm_list_command_invocations until every target is terminal or the
+    deadline passes. One paginated listing covers all 50 instances of a command.
+    """
+    while True:
+        results = {
+            iid: inv for iid, inv in ssm_list_command_invocations(command_id=command_id, region=region).items()
+            if inv["status"] in TERMINAL_STATUSES
+        }
+        if len(results) >= expected or time.time() >= deadline:
+            return results
+        time.sleep(2)
+
+
+def _parse_invocation(inv: Optional[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]], Optional[str]]:
+    if inv is None:
+        return "TimedOut", [], "no result before the report deadline"
+    status, output = inv["status"], inv["stdout"]     # output is capped at 2500 chars; Get-Volume JSON fits
+    if status != "Success":
+        return status, [], output.strip()[-500:] or inv["status_details"]
+    try:
+        return status, parse_volumes(output), None
+    except Exception as e:
+        return "ParseError", [], str(e)
+
+
+def _run_storage_report(app, stacks: List[Stack], actor: Optional[str]) -> None:
+    global _report_job
+    with app.app_context():
+        start = time.perf_counter()
+        timeout = int(app.config.get("STORAGE_REPORT_TIMEOUT", 120))
+        deadline = time.time() + timeout
+        rows: List[Dict[str, Any]] = []
+
+        # Group running DB hosts by region; stacks without one get a row straight away
+        by_region: Dict[str, List[Tuple[Stack, str]]] = {}
+        for stack in stacks:
+            db = stack.roles.get(DB_ROLE)
+            if not db:
+                rows.append(_row(stack, None, "NoDBInstance"))
+            elif db.state != "running":
+                rows.append(_row(stack, db.instance_id, "NotRunning"))
+            else:
+                by_region.setdefault(stack.region, []).append((stack, db.instance_id))
+
+        # One send_command per region per 50 instances
+        commands: List[Tuple[str, str, List[Tuple[Stack, str]]]] = []
+        for region, targets in by_region.items():
+            for i in range(0, len(targets), SEND_COMMAND_MAX_IDS):
+                chunk = targets[i:i + SEND_COMMAND_MAX_IDS]
+                try:
+                    cid = ssm_run_powershell(
+                        instance_ids=[iid for _, iid in chunk],
+                        commands=[VOLUMES_PS_SCRIPT],
+                        region=region,
+                        timeout_seconds=timeout,
+                        comment="Fleet storage report",
+                    )
+                    commands.append((region, cid, chunk))
+                except Exception as e:
+                    app.logger.exception("storage_report_send_failed: region=%s", region)
+                    rows.extend(_row(stack, iid, "SendFailed", error=str(e)) for stack, iid in chunk)
+
+        with _report_lock:
+            _report_job.update(state="collecting", commands=len(commands))
+
+        # Collect every command concurrently
+        if commands:
+            with ThreadPoolExecutor(max_workers=min(8, len(commands))) as pool:
+                futures = [
+                    (chunk, pool.submit(_collect_invocations, region, cid, len(chunk), deadline))
+                    for region, cid, chunk in commands
+                ]
+                for chunk, fut in futures:
+                    try:
+                        invs = fut.result()
+                    except Exception as e:
+                        app.logger.exception("storage_report_collect_failed")
+                        rows.extend(_row(stack, iid, "Error", error=str(e)) for stack, iid in chunk)
+                        continue
+                    for stack, iid in chunk:
+                        status, volumes, error = _parse_invocation(invs.get(iid))
+                        rows.append(_row(stack, iid, status, volumes=volumes, error=error))
+
+        rows.sort(key=lambda r: (r["worst_free_pct"] is None, r["worst_free_pct"] or 0, r["stack"]))
+        report = {
+            "generated_at": time.time(),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "commands": len(commands),
+            "rows": rows,
+        }
+        cache.set(REPORT_KEY, report, timeout=int(app.config.get("STORAGE_REPORT_TTL", 3600)))
+        with _report_lock:
+            _report_job.update(state="done", finished_at=time.time())
+
+        app.audit.info(
+            "storage_report.finished",
+            extra={"actor": actor, "stacks": len(rows), "commands": len(commands), "duration_ms": report["duration_ms"]},
+        )
+
+
+def start_storage_report(stacks: List[Stack], *, actor: Optional[str] = None) -> Dict[str, Any]:
+    """Run the fleet report in the background; returns the job (the running one if any)."""
+    global _report_job
+    with _report_lock:
+        if _report_job and _report_job["state"] in ("sending", "collecting"):
+            return dict(_report_job)
+        _report_job = {"state": "sending", "stacks": len(stacks), "commands": 0,
+                       "actor": actor, "started_at": time.time(), "finished_at": None}
+        job = dict(_report_job)
+
+    app = current_app._get_current_object()
+
+    def _target():
+        try:
+            _run_storage_report(app, stacks, actor)
+        except Exception:
+            app.logger.exception("storage_report_failed")
+            with _report_lock:
+                _report_job.update(state="failed", finished_at=time.time())
+
+    threading.Thread(target=_target, name="storage-report", daemon=True).start()
+    return job
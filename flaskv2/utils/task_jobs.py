@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from flask import current_app
+
+from flaskv2.extensions import cache
+from flaskv2.utils.background import PeriodicTask
+from flaskv2.utils.helpers import list_pssc_tasks
+
+SNAPSHOT_KEY = "task_scheduler_jobs:v1"
+
+
+class TaskSchedulerJobs:
+    """
+    Cached PSSC- task list for /bastion/task-scheduler-jobs.
+
+    Collecting it spawns PowerShell (and schtasks on failure), which takes
+    seconds, so pages read the last parsed list from memory instead. A
+    PeriodicTask re-collects it every TASK_SCHEDULER_REFRESH_SECONDS while
+    someone has viewed the page in the last TASK_SCHEDULER_IDLE_SECONDS.
+    A list older than TASK_SCHEDULER_TTL (e.g. the worker was idle) is
+    collected synchronously on read. Concurrent refreshes share one collection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._rows: List[Dict[str, Any]] | None = None
+        self._updated: float = 0.0
+        self._last_read: float = 0.0
+        self._task: PeriodicTask | None = None
+
+    def refresh(self) -> None:
+        requested = time.time()
+        with self._refresh_lock:
+            # Someone else collected while we waited for the lock
+            if self._updated >= requested:
+                return
+            start = time.perf_counter()
+            rows = list_pssc_tasks()
+            with self._lock:
+                self._rows = rows
+                self._updated = time.time()
+            cache.set(SNAPSHOT_KEY, {"rows": rows, "updated": self._updated},
+                      timeout=int(current_app.config.get("TASK_SCHEDULER_TTL", 300)))
+        current_app.app_log.info(
+            "task_scheduler_jobs_refreshed",
+            extra={"tasks": len(rows), "duration_ms": round((time.perf_counter() - start) * 1000, 2)},
+        )
+
+    def _tick(self) -> None:
+        if time.time() - self._last_read <= int(current_app.config.get("TASK_SCHEDULER_IDLE_SECONDS", 600)):
+            self.refresh()
+
+    def _ensure_started(self) -> None:
+        if self._task is None or not self._task.running:
+            interval = int(current_app.config.get("TASK_SCHEDULER_REFRESH_SECONDS", 60))
+            if self._task is None:
+                self._task = PeriodicTask("task-scheduler-jobs", self._tick, interval)
+            self._task.start(current_app._get_current_object())
+
+    def _load_cached(self) -> None:
+        snap = cache.get(SNAPSHOT_KEY)
+        if snap and snap["updated"] > self._updated:
+            with self._lock:
+                self._rows = snap["rows"]
+                self._updated = snap["updated"]
+
+    def get(self) -> Tuple[List[Dict[str, Any]], float]:
+        """Return (rows, age_seconds)."""
+        self._last_read = time.time()
+        self._ensure_started()
+        if self._rows is None:
+            self._load_cached()
+        if time.time() - self._updated > int(current_app.config.get("TASK_SCHEDULER_TTL", 300)):
+            self.refresh()
+        with self._lock:
+            return list(self._rows or []), time.time() - self._updated
+
+
+task_jobs = TaskSchedulerJobs()
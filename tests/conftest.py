@@ -0,0 +1,4 @@
+import os
+
+# flaskv2.config reads ENVNUM at import time; the unit tests never touch LARS, AWS or the DB
+os.environ.setdefault("ENVNUM", "1")
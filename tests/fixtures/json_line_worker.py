@@ -0,0 +1,24 @@
+"""
+Python stand-in for ps1_scripts/worker.ps1, speaking the JsonLineWorkerPool protocol.
+
+Request ops:  {"id": n, "op": "echo", "value": ...}   -> {"id": n, "ok": true, "output": value, "pid": <pid>}
+              {"id": n, "op": "sleep", "seconds": s}  -> sleeps, then answers like echo
+              {"id": n, "op": "crash"}                -> exits with rc 3 without answering
+A non-JSON banner line is printed at startup, like a noisy profile would.
+"""
+import json
+import os
+import sys
+import time
+
+print("stand-in worker ready", flush=True)
+for line in sys.stdin:
+    if not line.strip():
+        continue
+    req = json.loads(line)
+    op = req.get("op", "echo")
+    if op == "crash":
+        os._exit(3)
+    if op == "sleep":
+        time.sleep(float(req.get("seconds", 0)))
+    print(json.dumps({"id": req["id"], "ok": True, "output": req.get("value"), "pid": os.getpid()}), flush=True)
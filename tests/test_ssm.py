@@ -0,0 +1,273 @@
+import hashlib
+import os
+import shutil
+import stat
+import subprocess
+
+import pytest
+
+from flaskv2.utils.ssm import build_inject_lines
+
+FILES = ["a.jar", "b.jar", "c.jar", "d.jar"]
+
+# Stand-in for the AWS CLI on the target host:
+#   aws configure set <key> <value>   -> appended to $AWS_CONFIG_FILE
+#   aws s3 cp s3://.../<name> <dir>/   -> writes <dir>/<name>; names starting with "bad" fail (rc 7)
+# Every copy records how many copies were running when it started, to check the parallel gating.
+STUB_AWS = r"""#!/bin/bash
+if [ "$1" = configure ]; then printf '%s = %s\n' "$3" "$4" >> "$AWS_CONFIG_FILE"; exit 0; fi
+name="${3##*/}"
+touch "$STUB_DIR/running/$name"
+ls "$STUB_DIR/running" | wc -l >> "$STUB_DIR/concurrency"
+echo "$AWS_CONFIG_FILE" > "$STUB_DIR/config_path"
+sleep 0.3
+rm -f "$STUB_DIR/running/$name"
+case "$name" in bad*) echo "boom $name" >&2; exit 7;; esac
+printf x > "$4$name"
+"""
+
+
+# Stand-in for curl: `curl -fsSL --retry 3 -o <part> <url>` writes the URL's last path segment as content
+STUB_CURL = r"""#!/bin/bash
+printf '%s' "${6##*/}" > "$5"
+"""
+
+
+def _script(**kwargs) -> str:
+    opts = dict(bucket="migops", root="LARS/", key_prefix="MT/", files=FILES, dest="/opt/infor/landmark/tmp", preclear_names=[])
+    opts.update(kwargs)
+    return "\n".join(build_inject_lines(**opts))
+
+
+def test_sequential_by_default():
+    script = _script()
+    assert "copy_one" not in script
+    assert "wait -n" not in script
+    assert script.count("aws s3 cp ") == 2 * len(FILES)   # echo + command per file
+
+
+def test_parallel_gates_background_copies():
+    script = _script(parallel=3)
+    assert "copy_one() {" in script
+    # one gate before each background copy, throttled at N running jobs
+    assert script.count('while [ "$(jobs -rp | wc -l)" -ge 3 ]; do wait -n || true; done') == len(FILES)
+    for idx, name in enumerate(FILES):
+        assert f'copy_one {idx} "s3://migops/LARS/MT/{name}" &' in script
+        # each copy's exit code lands in its own .rc file and is checked afterwards
+        assert f'cat "$WORK/{idx}.rc"' in script
+        assert f'echo "[error] copy failed (rc=$rc): {name}"' in script
+    assert 'echo "$rc" > "$WORK/$1.rc"' in script
+    assert '[ "$FAILED" -eq 0 ] || exit 1' in script
+    assert script.index("wait || true") < script.index("FAILED=0")
+
+
+def test_transfer_tuning_uses_a_temp_config():
+    script = _script(parallel=2, s3_max_concurrent_requests=20, s3_multipart_chunksize="64MB")
+    assert 'export AWS_CONFIG_FILE="$WORK/aws_config"' in script
+    assert "aws configure set default.s3.max_concurrent_requests 20" in script
+    assert "aws configure set default.s3.multipart_chunksize 64MB" in script
+    assert script.index("export AWS_CONFIG_FILE") < script.index("aws configure set")
+
+
+def test_no_temp_config_without_tuning():
+    assert "AWS_CONFIG_FILE" not in _script(parallel=2)
+
+
+def _direct(files, checks=None, **kwargs) -> str:
+    urls = {name: f"https://lars.example/builds/{name}" for name in files}
+    return _script(files=files, source_urls=urls, source_checks=checks or {}, **kwargs)
+
+
+def test_direct_rejects_a_sidecar_that_is_not_a_sha256():
+    with pytest.raises(ValueError, match="invalid sha256"):
+        _direct(["a.jar"], {"a.jar": (1, '"; touch /tmp/pwned; "')})
+    with pytest.raises(ValueError, match="invalid sha256"):
+        _direct(["a.jar"], {"a.jar": (1, "$(reboot)")})
+
+
+def test_direct_rejects_unsafe_file_names():
+    with pytest.raises(ValueError, match="unsafe file name"):
+        _direct(["a.jar; reboot"])
+
+
+def test_direct_quotes_every_value():
+    sha = hashlib.sha256(b"a.jar").hexdigest()
+    urls = {"a.jar": "https://lars.example/$(id)/a.jar"}
+    script = _script(files=["a.jar"], source_urls=urls, source_checks={"a.jar": (5, sha)})
+    assert f"fetch_one 0 'https://lars.example/$(id)/a.jar' a.jar 5 {sha} &" in script
+    assert """echo " - curl "'https://lars.example/$(id)/a.jar'" -> $DEST/a.jar (background)\"""" in script
+    # nothing known => empty, quoted arguments (no checks on the host)
+    assert "fetch_one 0 https://lars.example/builds/a.jar a.jar '' '' &" in _direct(["a.jar"])
+
+
+needs_bash = pytest.mark.skipif(shutil.which("bash") is None, reason="bash not available")
+
+
+def _run(tmp_path, script: str) -> subprocess.CompletedProcess:
+    stub_dir = tmp_path / "stub"
+    # safe to call more than once per test, e.g. for a second inject into the same $DEST
+    (stub_dir / "bin").mkdir(parents=True, exist_ok=True)
+    (stub_dir / "running").mkdir(exist_ok=True)
+    for tool, body in (("aws", STUB_AWS), ("curl", STUB_CURL)):
+        path = stub_dir / "bin" / tool
+        path.write_text(body)
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    home = tmp_path / "home"
+    (home / ".aws").mkdir(parents=True, exist_ok=True)
+    (home / ".aws" / "config").write_text("[default]\nregion = us-east-1\n")
+    env = {
+        "PATH": f"{stub_dir / 'bin'}:{os.environ.get('PATH', '/usr/bin:/bin')}",
+        "HOME": str(home),
+        "STUB_DIR": str(stub_dir),
+    }
+    return subprocess.run(["bash", "--noprofile", "--norc", "-c", script], env=env,
+                          capture_output=True, text=True, timeout=60)
+
+
+@needs_bash
+def test_parallel_script_copies_everything(tmp_path):
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    result = _run(tmp_path, _script(dest=str(dest), parallel=2))
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert sorted(p.name for p in dest.iterdir()) == FILES
+    counts = [int(n) for n in (tmp_path / "stub" / "concurrency").read_text().split()]
+    assert max(counts) == 2   # never more than `parallel` copies at once, but they do overlap
+
+
+@needs_bash
+def test_parallel_script_fails_after_all_copies_when_one_fails(tmp_path):
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    files = ["a.jar", "bad.jar", "c.jar"]
+    result = _run(tmp_path, _script(dest=str(dest), files=files, parallel=3))
+    assert result.returncode == 1
+    assert "[error] copy failed (rc=7): bad.jar" in result.stdout
+    assert result.stdout.count("[error] copy failed") == 1
+    # the other copies still completed, and the final listing is not reached
+    assert sorted(p.name for p in dest.iterdir()) == ["a.jar", "c.jar"]
+    assert "final destination listing" not in result.stdout
+
+
+@needs_bash
+def test_tuning_leaves_the_host_config_untouched(tmp_path):
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    host_config = tmp_path / "home" / ".aws" / "config"
+    result = _run(tmp_path, _script(dest=str(dest), parallel=2, s3_max_concurrent_requests=20))
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert host_config.read_text() == "[default]\nregion = us-east-1\n"
+    # the copies ran against the temp copy, which is removed with $WORK on exit
+    used = (tmp_path / "stub" / "config_path").read_text().strip()
+    assert used.endswith("/aws_config") and used != str(host_config)
+    assert not os.path.exists(used)
+
+
+@needs_bash
+def test_direct_script_checks_sha256(tmp_path):
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    good = hashlib.sha256(b"a.jar").hexdigest()
+    wrong = hashlib.sha256(b"something else").hexdigest()
+    checks = {"a.jar": (5, good), "b.jar": (5, wrong)}
+    result = _run(tmp_path, _direct(["a.jar", "b.jar"], checks, dest=str(dest), parallel=2))
+    assert result.returncode == 1
+    assert f"[sha256] {good}  a.jar" in result.stdout
+    assert "[error] sha256 mismatch: b.jar" in result.stdout
+    assert "[error] copy failed (rc=91): b.jar" in result.stdout
+    # the mismatching download never lands in $DEST, not even as a .part file
+    assert sorted(p.name for p in dest.iterdir()) == ["a.jar"]
+
+
+SIGS = {"a.jar": (1, '"etag-a"'), "b.jar": (1, '"etag-b"')}   # the stub aws writes one byte per file
+
+
+def _meta(dest) -> dict[str, tuple[str, str]]:
+    path = dest / ".inject-meta"
+    if not path.exists():
+        return {}
+    return {name: (size, etag) for name, size, etag in (line.split("\t") for line in path.read_text().splitlines())}
+
+
+def _copied(result: subprocess.CompletedProcess) -> list[str]:
+    """Names of the files the run actually copied, from its ' - aws s3 cp s3://.../<name> ...' lines."""
+    return sorted(line.split()[4].rsplit("/", 1)[-1]
+                  for line in result.stdout.splitlines() if line.startswith(" - aws s3 cp "))
+
+
+def test_sync_leaves_synced_names_out_of_the_preclear():
+    script = _script(files=["a.jar", "c.jar"], sync_signatures={"a.jar": SIGS["a.jar"]}, preclear_names=["a.jar", "c.jar"])
+    assert 'rm -f "$DEST/c.jar"' in script
+    assert 'rm -f "$DEST/a.jar"' not in script
+
+
+@needs_bash
+@pytest.mark.parametrize("parallel", [1, 3])
+def test_sync_skips_unchanged_files_on_the_second_run(tmp_path, parallel):
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    files = ["a.jar", "b.jar", "c.jar"]   # c.jar has no signature: always copied
+    first = _run(tmp_path, _script(dest=str(dest), files=files, sync_signatures=SIGS, parallel=parallel))
+    assert first.returncode == 0, first.stdout + first.stderr
+    assert _copied(first) == files
+    assert _meta(dest) == {"a.jar": ("1", "etag-a"), "b.jar": ("1", "etag-b")}
+
+    second = _run(tmp_path, _script(dest=str(dest), files=files, sync_signatures=SIGS, parallel=parallel))
+    assert second.returncode == 0, second.stdout + second.stderr
+    assert "[skip] a.jar (unchanged)" in second.stdout
+    assert "[skip] b.jar (unchanged)" in second.stdout
+    assert "[info] skipped unchanged: a.jar b.jar" in second.stdout
+    assert _copied(second) == ["c.jar"]
+
+
+@needs_bash
+@pytest.mark.parametrize("parallel", [1, 3])
+@pytest.mark.parametrize("changed", [(1, '"etag-a2"'), (2, '"etag-a"')], ids=["etag", "size"])
+def test_sync_copies_when_the_signature_changes(tmp_path, parallel, changed):
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    _run(tmp_path, _script(dest=str(dest), files=["a.jar", "b.jar"], sync_signatures=SIGS, parallel=parallel))
+    result = _run(tmp_path, _script(dest=str(dest), files=["a.jar", "b.jar"],
+                                    sync_signatures={**SIGS, "a.jar": changed}, parallel=parallel))
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert _copied(result) == ["a.jar"]
+    assert _meta(dest)["a.jar"] == (str(changed[0]), changed[1].strip('"'))
+
+
+@needs_bash
+@pytest.mark.parametrize("parallel", [1, 3])
+def test_sync_does_not_record_a_failed_copy(tmp_path, parallel):
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    sigs = {"a.jar": SIGS["a.jar"], "bad.jar": (1, '"etag-bad"')}
+    result = _run(tmp_path, _script(dest=str(dest), files=["a.jar", "bad.jar"], sync_signatures=sigs, parallel=parallel))
+    assert result.returncode != 0
+    assert "bad.jar" not in _meta(dest)
+    if parallel > 1:   # the other copy still finished and was recorded
+        assert _meta(dest) == {"a.jar": ("1", "etag-a")}
+
+
+@needs_bash
+@pytest.mark.parametrize("parallel", [1, 3])
+@pytest.mark.parametrize("other", ["s3", "direct", "preclear"])
+def test_other_injects_invalidate_the_sync_marker(tmp_path, parallel, other):
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    first = _run(tmp_path, _script(dest=str(dest), files=["a.jar", "b.jar"], sync_signatures=SIGS, parallel=parallel))
+    assert first.returncode == 0, first.stdout + first.stderr
+
+    # something else replaces (or removes) a.jar with a same-sized file
+    if other == "s3":
+        replace = _script(dest=str(dest), files=["a.jar"], parallel=parallel)
+    elif other == "direct":
+        replace = _direct(["a.jar"], dest=str(dest), parallel=parallel)
+    else:
+        replace = _script(dest=str(dest), files=[], preclear_names=["a.jar"])
+    result = _run(tmp_path, replace)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert _meta(dest) == {"b.jar": ("1", "etag-b")}
+
+    again = _run(tmp_path, _script(dest=str(dest), files=["a.jar", "b.jar"], sync_signatures=SIGS, parallel=parallel))
+    assert again.returncode == 0, again.stdout + again.stderr
+    assert "[skip] a.jar" not in again.stdout
+    assert _copied(again) == ["a.jar"]
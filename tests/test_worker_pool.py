@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+
+import pytest
+
+from flaskv2.utils.helpers import JsonLineWorkerPool, WorkerError
+
+WORKER = os.path.join(os.path.dirname(__file__), "fixtures", "json_line_worker.py")
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**kwargs):
+        opts = dict(size=1, timeout=10, max_requests=500)
+        opts.update(kwargs)
+        pool = JsonLineWorkerPool([sys.executable, WORKER], **opts)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def _gone(pid: int) -> bool:
+    # the pool reaps killed workers, so the pid no longer exists
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return True
+    return False
+
+
+def test_reuses_one_worker_and_skips_banner(make_pool):
+    pool = make_pool()
+    first = pool.call({"op": "echo", "value": "a"})
+    second = pool.call({"op": "echo", "value": "b"})
+    assert (first["ok"], first["output"]) == (True, "a")
+    assert second["output"] == "b"
+    assert second["id"] == first["id"] + 1
+    assert first["pid"] == second["pid"]
+
+
+def test_recycles_after_max_requests(make_pool):
+    pool = make_pool(max_requests=2)
+    pids = [pool.call({"op": "echo"})["pid"] for _ in range(5)]
+    assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+    assert _gone(pids[0])
+
+
+def test_crash_raises_and_next_call_respawns(make_pool):
+    pool = make_pool()
+    before = pool.call({"op": "echo"})["pid"]
+    with pytest.raises(WorkerError, match=r"worker exited \(rc=3\)"):
+        pool.call({"op": "crash"})
+    after = pool.call({"op": "echo", "value": "ok"})
+    assert after["output"] == "ok"
+    assert after["pid"] != before
+
+
+def test_timeout_kills_the_worker(make_pool):
+    pool = make_pool()
+    slow = pool.call({"op": "echo"})["pid"]
+    start = time.monotonic()
+    with pytest.raises(WorkerError, match="no response within"):
+        pool.call({"op": "sleep", "seconds": 30}, timeout=0.5)
+    assert time.monotonic() - start < 5
+    assert _gone(slow)
+    assert pool.call({"op": "echo"})["pid"] != slow
+
+
+def test_spawn_failure_is_a_worker_error(tmp_path):
+    pool = JsonLineWorkerPool([str(tmp_path / "no-such-interpreter")], size=1, timeout=5)
+    with pytest.raises(WorkerError, match="cannot start worker"):
+        pool.call({"op": "echo"})
+    # the slot was released, so the next call fails the same way instead of waiting
+    with pytest.raises(WorkerError, match="cannot start worker"):
+        pool.call({"op": "echo"}, timeout=0.5)
+
+
+def test_closed_pool_refuses_calls(make_pool):
+    pool = make_pool()
+    pid = pool.call({"op": "echo"})["pid"]
+    pool.close()
+    assert _gone(pid)
+    with pytest.raises(WorkerError, match="pool is closed"):
+        pool.call({"op": "echo"})